@@ -6,7 +6,9 @@ Cumple con PEP 8 y PEP 257.
 """
 
 import re
-from datetime import datetime
+from datetime import date, datetime
+from etiquetas import internar
+from recurrencia import Recurrencia
 
 
 class Tarea:
@@ -18,13 +20,17 @@ class Tarea:
         titulo (str): Título breve de la tarea.
         prioridad (int): Número entero entre 1 y 5 que indica la prioridad.
         fecha (str): Fecha en formato 'AAAA-MM-DD'.
-        etiquetas (list[str]): Lista de etiquetas asociadas.
+        etiquetas (tuple[str]): Etiquetas asociadas, como tupla internada
+            compartida entre las tareas con las mismas etiquetas.
         descripcion (str): Descripción opcional de la tarea.
         completada (bool): Estado de finalización de la tarea.
+        recurrencia (Recurrencia | None): Regla de repetición; si existe,
+            `fecha` es la de la primera ocurrencia.
     """
 
     def __init__(self, id_, titulo, prioridad, fecha,
-                 etiquetas=None, descripcion="", completada=False):
+                 etiquetas=None, descripcion="", completada=False,
+                 recurrencia=None):
         """
         Inicializa una nueva tarea validando campos básicos.
 
@@ -33,9 +39,11 @@ class Tarea:
             titulo (str): Título breve.
             prioridad (int): Valor entre 1 y 5.
             fecha (str): Fecha en formato 'AAAA-MM-DD'.
-            etiquetas (list[str], opcional): Lista de etiquetas. Por defecto [].
+            etiquetas (iterable[str], opcional): Etiquetas. Por defecto ().
             descripcion (str, opcional): Texto descriptivo. Por defecto "".
             completada (bool, opcional): Estado inicial. Por defecto False.
+            recurrencia (Recurrencia | dict, opcional): Regla de repetición.
+                Por defecto None (tarea única).
 
         Raises:
             ValueError: Si algún campo no cumple las validaciones.
@@ -44,9 +52,12 @@ class Tarea:
         self.titulo = titulo.strip()
         self.prioridad = self._validar_prioridad(prioridad)
         self.fecha = self._validar_fecha(fecha)
-        self.etiquetas = etiquetas if etiquetas is not None else []
+        self.etiquetas = internar(etiquetas)
         self.descripcion = descripcion.strip()
         self.completada = bool(completada)
+        if isinstance(recurrencia, dict):
+            recurrencia = Recurrencia.from_dict(recurrencia)
+        self.recurrencia = recurrencia
 
     @staticmethod
     def _validar_id(id_):
@@ -78,6 +89,39 @@ class Tarea:
         """Marca la tarea como completada."""
         self.completada = True
 
+    def ocurrencias(self, desde=None, hasta=None):
+        """
+        Genera las ocurrencias de la tarea dentro de una ventana de fechas.
+
+        Una tarea sin recurrencia se produce a sí misma si su fecha cae en la
+        ventana. Una recurrente produce una Tarea por ocurrencia, con id
+        '<id>@<fecha>', creada al vuelo y nunca almacenada.
+
+        Args:
+            desde (date, opcional): Inicio de la ventana (inclusive).
+            hasta (date, opcional): Fin de la ventana (inclusive).
+
+        Yields:
+            Tarea: Tareas u ocurrencias dentro de la ventana.
+        """
+        inicio = date.fromisoformat(self.fecha)
+        if self.recurrencia is None:
+            if (desde is None or inicio >= desde) and (hasta is None or inicio <= hasta):
+                yield self
+            return
+
+        for dia in self.recurrencia.ocurrencias(inicio, desde, hasta):
+            fecha = dia.isoformat()
+            yield Tarea(
+                id_=f"{self.id}@{fecha}",
+                titulo=self.titulo,
+                prioridad=self.prioridad,
+                fecha=fecha,
+                etiquetas=self.etiquetas,
+                descripcion=self.descripcion,
+                completada=fecha in self.recurrencia.hechas,
+            )
+
     def to_dict(self):
         """
         Convierte la tarea a un diccionario serializable en JSON.
@@ -85,15 +129,18 @@ class Tarea:
         Returns:
             dict: Representación de la tarea.
         """
-        return {
+        datos = {
             "id": self.id,
             "titulo": self.titulo,
             "prioridad": self.prioridad,
             "fecha": self.fecha,
-            "etiquetas": self.etiquetas,
+            "etiquetas": list(self.etiquetas),
             "descripcion": self.descripcion,
             "completada": self.completada,
         }
+        if self.recurrencia is not None:
+            datos["recurrencia"] = self.recurrencia.to_dict()
+        return datos
 
     @classmethod
     def from_dict(cls, data):
@@ -112,4 +159,7 @@ class Tarea:
             prioridad=data["prioridad"],
             fecha=data["fecha"],
             etiquetas=data.get("etiquetas", []),
+            descripcion=data.get("descripcion", ""),
+            completada=data.get("completada", False),
+            recurrencia=data.get("recurrencia"),
             )
@@ -14,12 +14,24 @@ Equipo (en orden alfabetico) :
 import argparse
 import json
 import os
-from datetime import datetime
+from collections import Counter
+from datetime import date, datetime, timedelta
+from itertools import chain
+import espacio
+import historial
+import parametros
+from etiquetas import Vocabulario, codificar, decodificar
+from flujo import iterar_documento
+from orden_externo import LIMITE_MEMORIA, OrdenadorExterno
+from recurrencia import FRECUENCIAS, Recurrencia
 from Tarea import Tarea
 
 # Archivo por defecto para almacenar las tareas
 DATA_FILE = ".tareas.json"
 
+# Días que abarca una ventana si sólo se indica --desde
+HORIZONTE_DIAS = 365
+
 
 def cargar_tareas(archivo=DATA_FILE):
     """Cargar tareas desde un archivo JSON.
@@ -31,21 +43,59 @@ def cargar_tareas(archivo=DATA_FILE):
         list: Lista de objetos Tarea cargados desde el archivo.
     """
 
-    if not os.path.exists(archivo):
-        return []
-    with open(archivo, "r", encoding="utf-8") as f:
-        datos = json.load(f)
-    return [Tarea.from_dict(d) for d in datos]
+    return [Tarea.from_dict(d) for d in decodificar(_leer_documento(archivo))]
+
+def iterar_tareas(archivo=DATA_FILE):
+    """Generar las tareas del archivo una a una, sin cargarlo completo.
 
-def guardar_tareas(tareas, archivo=DATA_FILE):
+    Args:
+        archivo (str): Ruta del archivo desde donde leer las tareas.
+
+    Yields:
+        Tarea: Tareas en el orden del archivo.
+    """
+    for d in iterar_documento(archivo):
+        yield Tarea.from_dict(d)
+
+def guardar_tareas(tareas, archivo=DATA_FILE, motivo=None):
     """Guardar tareas en un archivo JSON.
     
     Args:
         tareas (list): Lista de objetos Tarea a guardar.
         archivo (str): Ruta del archivo donde guardar las tareas.
+        motivo (str, opcional): Si se indica, el cambio se registra en el
+            historial con esta descripción (ver historial.py).
+    """
+    datos = [t.to_dict() for t in tareas]
+    antes = _leer_datos(archivo) if motivo is not None else None
+    _escribir_datos(datos, archivo)
+    if motivo is not None:
+        historial.registrar(archivo, antes, datos, motivo)
+
+def _leer_datos(archivo):
+    """Leer la lista de diccionarios guardada en el archivo ([] si no existe).
+
+    Las etiquetas se devuelven como listas de cadenas, igual que en
+    Tarea.to_dict, para poder comparar estados en el historial.
     """
+    return [{**d, "etiquetas": list(d["etiquetas"])}
+            for d in decodificar(_leer_documento(archivo))]
+
+def _escribir_datos(datos, archivo):
+    """Escribir la lista de diccionarios en el archivo JSON (con vocabulario)."""
+    _escribir_documento(codificar(datos), archivo)
+
+def _leer_documento(archivo):
+    """Leer el contenido JSON del archivo tal cual ([] si no existe)."""
+    if not os.path.exists(archivo):
+        return []
+    with open(archivo, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _escribir_documento(documento, archivo):
+    """Escribir el contenido JSON del archivo tal cual."""
     with open(archivo, "w", encoding="utf-8") as f:
-        json.dump([t.to_dict() for t in tareas], f, indent=2, ensure_ascii=False)
+        json.dump(documento, f, indent=2, ensure_ascii=False)
 
 def generar_id(tareas):
     """Generar un ID único para una nueva tarea.
@@ -69,7 +119,13 @@ def cmd_add(args):
     # Crear nueva tarea
     tareas = cargar_tareas()
     nuevo_id = generar_id(tareas)
-    etiquetas = args.etiquetas.split(",") if args.etiquetas else []
+    etiquetas = [e.strip() for e in args.etiquetas.split(",")] if args.etiquetas else []
+    etiquetas = [e for e in etiquetas if e]
+    recurrencia = None
+    if args.repetir:
+        hasta = args.repetir_hasta.isoformat() if args.repetir_hasta else None
+        recurrencia = Recurrencia(args.repetir, intervalo=args.cada or 1,
+                                  hasta=hasta, veces=args.veces)
     tarea = Tarea(
         id_=nuevo_id,
         titulo=args.titulo,
@@ -77,53 +133,212 @@ def cmd_add(args):
         fecha=args.fecha,
         etiquetas=etiquetas,
         descripcion=args.descripcion,
+        recurrencia=recurrencia,
     )
 
     # Guardar tarea
     tareas.append(tarea)
-    guardar_tareas(tareas)
+    guardar_tareas(tareas, motivo=f"add {nuevo_id}")
     print(f"Tarea añadida con id {nuevo_id}")
 
 def cmd_ls(args):
     """Manejador del comando ls: listar tareas."""
 
-    tareas = cargar_tareas()
-
-     # Verificar si no hay tareas
-    if not tareas:
-        print("No hay tareas.")
+    ventana = ventana_de_args(args)
+    if args.espacio:
+        agendas = _agendas_espacio()
+        if agendas is None:
+            return
+        # Cada agenda se carga y ordena en paralelo; luego mezcla de k vías
+        listas = espacio.consultar(_consulta_ls, agendas, ventana, args.por,
+                                   procesos=args.procesos)
+        if args.por:
+            tareas = espacio.fusionar(listas, lambda t: getattr(t, args.por))
+        else:
+            tareas = chain.from_iterable(listas)
+        if not _imprimir_tareas(tareas):
+            print("No hay tareas.")
         return
+
+    # Agenda local: se lee en flujo y, si hay que ordenar, con orden externo
+    tareas = iterar_tareas()
+    if ventana:
+        tareas = expandir(tareas, *ventana)
+    limite = args.memoria or LIMITE_MEMORIA
+    with OrdenadorExterno(lambda t: getattr(t, args.por), limite) as orden:
+        if args.por:
+            orden.extender(tareas)
+            tareas = orden
+
+        # Verificar si no hay tareas
+        if not _imprimir_tareas(tareas):
+            print("No hay tareas.")
+
+def _tareas_ls(tareas, ventana, por):
+    """Expandir a la ventana (si la hay) y ordenar por el campo `por`."""
+    # Con una ventana de fechas se expanden las tareas recurrentes
+    if ventana:
+        tareas = expandir(tareas, *ventana)
     
     # Ordenar tareas si se especificó un criterio
-    if args.por:
-        tareas.sort(key=lambda t: getattr(t, args.por))
-    for t in tareas:
-        estado = "X" if hasattr(t, 'hecha') and t.hecha else "."
-        print(f"{t.id} [{estado}] {t.fecha} (p{t.prioridad}) {t.titulo}")
+    if por:
+        tareas = sorted(tareas, key=lambda t: getattr(t, por))
+    return tareas
+
+def _consulta_ls(nombre, ruta, ventana, por):
+    """Consulta de ls sobre una agenda del espacio (se ejecuta en el pool)."""
+    tareas = espacio.con_espacio(cargar_tareas(ruta), nombre)
+    return list(_tareas_ls(tareas, ventana, por))
 
 def cmd_find(args):
     """Manejador del comando find: buscar tareas por término."""
 
-    tareas = cargar_tareas()
-    term = args.termino.lower()
+    if args.espacio:
+        agendas = _agendas_espacio()
+        if agendas is None:
+            return
+        listas = espacio.consultar(_consulta_find, agendas, args.termino,
+                                   procesos=args.procesos)
+        _imprimir_tareas(chain.from_iterable(listas))
+    else:
+        _imprimir_tareas(_buscar(cargar_tareas(), args.termino))
+
+def _buscar(tareas, termino):
+    """Filtrar las tareas que contienen `termino` en título o descripción."""
+    term = termino.lower()
 
     # Filtrar tareas que contengan el término en título o descripción
-    encontradas = [
+    return [
         t for t in tareas
         if term in t.titulo.lower() or term in t.descripcion.lower()
     ]
-    for t in encontradas:
-        estado = "X" if hasattr(t, 'hecha') and t.hecha else "."
-        print(f"{t.id} [{estado}] {t.fecha} (p{t.prioridad}) {t.titulo}")
+
+def _consulta_find(nombre, ruta, termino):
+    """Consulta de find sobre una agenda del espacio (se ejecuta en el pool)."""
+    return _buscar(espacio.con_espacio(cargar_tareas(ruta), nombre), termino)
+
+def _imprimir_tareas(tareas):
+    """Imprimir una línea por tarea con su id, estado, fecha y prioridad.
+
+    Returns:
+        int: Número de tareas impresas.
+    """
+    n = 0
+    for n, t in enumerate(tareas, 1):
+        estado = "X" if t.completada else "."
+        repite = f" ({t.recurrencia})" if t.recurrencia else ""
+        print(f"{t.id} [{estado}] {t.fecha} (p{t.prioridad}) {t.titulo}{repite}")
+    return n
+
+def _agendas_espacio():
+    """Cargar las agendas registradas (None, con aviso, si no hay)."""
+    agendas = espacio.cargar_espacio()
+    if not agendas:
+        print("Error: No hay agendas registradas (usa 'espacio add')")
+        return None
+    return agendas
+
+def _resolver_id(texto):
+    """Separar un id con espacio de nombres ('equipo:T-0001').
+
+    Returns:
+        tuple | None: (archivo de datos, id local), o None si la agenda no
+        está registrada.
+    """
+    nombre, sep, id_ = texto.partition(":")
+    if not sep:
+        return DATA_FILE, texto
+    archivo = _archivo_agenda(nombre)
+    if archivo is None:
+        return None
+    return archivo, id_
+
+def _archivo_agenda(nombre=None):
+    """Archivo de datos de la agenda `nombre` del espacio (local si es None).
+
+    Returns:
+        str | None: Ruta del archivo, o None (con aviso) si la agenda no
+        está registrada.
+    """
+    if nombre is None:
+        return DATA_FILE
+    agendas = espacio.cargar_espacio()
+    if nombre not in agendas:
+        print(f"Error: La agenda {nombre} no está registrada")
+        return None
+    return agendas[nombre]
+
+def expandir(tareas, desde=None, hasta=None):
+    """Generar las tareas y ocurrencias que caen en una ventana de fechas.
+
+    Las ocurrencias de las tareas recurrentes se crean al vuelo; nunca se
+    construye la lista completa.
+
+    Args:
+        tareas (iterable): Tareas a expandir.
+        desde (date, opcional): Inicio de la ventana (inclusive).
+        hasta (date, opcional): Fin de la ventana (inclusive).
+
+    Yields:
+        Tarea: Tareas únicas y ocurrencias dentro de la ventana.
+    """
+    for t in tareas:
+        yield from t.ocurrencias(desde, hasta)
+
+def ventana_de_args(args):
+    """Obtener la ventana (desde, hasta) de --desde/--hasta, o None."""
+    if args.desde is None and args.hasta is None:
+        return None
+    hasta = args.hasta or args.desde + timedelta(days=HORIZONTE_DIAS)
+    return args.desde, hasta
+
+def entero_positivo(texto):
+    """Convertir un argumento en entero positivo (error de argparse si no)."""
+    try:
+        return parametros.entero_positivo(texto)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+def fecha_arg(texto):
+    """Convertir un argumento 'AAAA-MM-DD' en date (error de argparse si no)."""
+    try:
+        return datetime.strptime(texto, "%Y-%m-%d").date()
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Fecha inválida: {texto}") from exc
 
 def cmd_done(args):
     """Manejador del comando done: marcar tarea como completada."""
-    tareas = cargar_tareas()
+    resuelto = _resolver_id(args.id)
+    if resuelto is None:
+        return
+    archivo, id_local = resuelto
+    tareas = cargar_tareas(archivo)
+    # Las ocurrencias de tareas recurrentes se identifican como T-XXXX@AAAA-MM-DD
+    id_, _, fecha = id_local.partition("@")
 
     for t in tareas:
-        if t.id == args.id:
-            t.hecha = True
-            guardar_tareas(tareas)
+        if t.id == id_:
+            if t.recurrencia is None and fecha:
+                print(f"Error: La tarea {id_} no es recurrente")
+                return
+            if t.recurrencia is not None:
+                if not fecha:
+                    print(f"Error: La tarea {id_} es recurrente; indica la "
+                          f"ocurrencia como {id_}@AAAA-MM-DD")
+                    return
+                try:
+                    dia = date.fromisoformat(fecha)
+                except ValueError:
+                    dia = None
+                if dia is None or not t.recurrencia.es_ocurrencia(
+                        date.fromisoformat(t.fecha), dia):
+                    print(f"Error: {fecha} no es una ocurrencia de la tarea {id_}")
+                    return
+                # Sólo se guarda la excepción, no la ocurrencia
+                t.recurrencia.hechas.add(dia.isoformat())
+            else:
+                t.marcar_completada()
+            guardar_tareas(tareas, archivo, motivo=f"done {id_local}")
             print(f"Tarea {args.id} marcada como hecha")
             return
         
@@ -133,14 +348,18 @@ def cmd_done(args):
 def cmd_rm(args):
     """Manejador del comando rm: eliminar una tarea."""
 
-    tareas = cargar_tareas()
-    nuevas_tareas = [t for t in tareas if t.id != args.id]
+    resuelto = _resolver_id(args.id)
+    if resuelto is None:
+        return
+    archivo, id_ = resuelto
+    tareas = cargar_tareas(archivo)
+    nuevas_tareas = [t for t in tareas if t.id != id_]
 
     # Verificar si se eliminó alguna tarea
     if len(nuevas_tareas) == len(tareas):
         print(f"Error: No se encontró la tarea {args.id}")
         return
-    guardar_tareas(nuevas_tareas)
+    guardar_tareas(nuevas_tareas, archivo, motivo=f"rm {id_}")
     print(f"Tarea {args.id} eliminada")
 
 def cmd_save(args):
@@ -155,9 +374,215 @@ def cmd_load(args):
         print(f"Error: El archivo {args.archivo} no existe")
         return
     tareas = cargar_tareas(args.archivo)
-    guardar_tareas(tareas)
+    guardar_tareas(tareas, motivo=f"load {args.archivo}")
     print(f"Tareas cargadas desde {args.archivo}")
 
+def cmd_stats(args):
+    """Manejador del comando stats: resumen de la agenda."""
+    ventana = ventana_de_args(args)
+    if args.espacio:
+        agendas = _agendas_espacio()
+        if agendas is None:
+            return
+        resumenes = espacio.consultar(_consulta_stats, agendas, ventana,
+                                      procesos=args.procesos)
+        resumen = Counter()
+        for nombre, parcial in zip(agendas, resumenes):
+            print(f"{nombre}: {parcial['total']} tareas, "
+                  f"{parcial['completadas']} completadas")
+            resumen.update(parcial)
+    else:
+        resumen = _resumir(cargar_tareas(), ventana)
+
+    if ventana:
+        desde, hasta = ventana
+        print(f"Ventana: {desde or 'inicio'} a {hasta}")
+    print(f"Total: {resumen['total']}")
+    print(f"Pendientes: {resumen['total'] - resumen['completadas']}")
+    print(f"Completadas: {resumen['completadas']}")
+    print(f"Reglas recurrentes: {resumen['recurrentes']}")
+    for p in range(5, 0, -1):
+        print(f"  p{p}: {resumen[f'p{p}']}")
+
+def _resumir(tareas, ventana):
+    """Contar tareas por estado y prioridad.
+
+    Returns:
+        Counter: Claves 'total', 'completadas', 'recurrentes' y 'p1'..'p5'.
+    """
+    resumen = Counter(total=0, completadas=0,
+                      recurrentes=sum(1 for t in tareas if t.recurrencia is not None))
+    if ventana:
+        tareas = expandir(tareas, *ventana)
+
+    # Conteo en un solo recorrido, sin materializar las ocurrencias
+    for t in tareas:
+        resumen["total"] += 1
+        resumen["completadas"] += t.completada
+        resumen[f"p{t.prioridad}"] += 1
+    return resumen
+
+def _consulta_stats(nombre, ruta, ventana):
+    """Consulta de stats sobre una agenda del espacio (se ejecuta en el pool)."""
+    return _resumir(cargar_tareas(ruta), ventana)
+
+def cmd_espacio(args):
+    """Manejador del comando espacio: registrar agendas del espacio de trabajo."""
+    agendas = espacio.cargar_espacio()
+
+    if args.accion == "ls":
+        if not agendas:
+            print("No hay agendas registradas.")
+        for nombre, ruta in agendas.items():
+            aviso = "" if os.path.exists(ruta) else " (no existe aún)"
+            print(f"{nombre}: {ruta}{aviso}")
+        return
+
+    if args.accion == "add":
+        try:
+            espacio.validar_nombre(args.nombre)
+        except ValueError as exc:
+            print(f"Error: {exc}")
+            return
+        if args.nombre in agendas:
+            print(f"Error: La agenda {args.nombre} ya está registrada")
+            return
+        agendas[args.nombre] = args.ruta
+        espacio.guardar_espacio(agendas)
+        print(f"Agenda {args.nombre} registrada ({args.ruta})")
+    else:
+        if agendas.pop(args.nombre, None) is None:
+            print(f"Error: La agenda {args.nombre} no está registrada")
+            return
+        espacio.guardar_espacio(agendas)
+        print(f"Agenda {args.nombre} quitada del espacio")
+
+def cmd_etiquetas(args):
+    """Manejador del comando etiquetas: listar, renombrar y fusionar etiquetas."""
+    documento = _leer_documento(DATA_FILE)
+    if isinstance(documento, list):
+        # Formato anterior: se pasa una sola vez al formato con vocabulario
+        documento = codificar(decodificar(documento))
+    vocabulario = Vocabulario(documento["etiquetas"])
+
+    if args.accion == "ls":
+        usos = Counter()
+        for d in documento["tareas"]:
+            usos.update(set(vocabulario.tupla(d["etiquetas"])))
+        if not usos:
+            print("No hay etiquetas.")
+        for nombre, cuenta in sorted(usos.items()):
+            print(f"{nombre} ({cuenta})")
+        return
+
+    viejo, nuevo = args.viejo.strip(), args.nuevo.strip()
+    if viejo not in vocabulario:
+        print(f"Error: No existe la etiqueta {viejo}")
+        return
+    if not nuevo or nuevo == viejo:
+        print("Error: Indica un nombre de etiqueta distinto")
+        return
+    if args.accion == "renombrar" and nuevo in vocabulario:
+        print(f"Error: La etiqueta {nuevo} ya existe; usa 'etiquetas fusionar'")
+        return
+    if args.accion == "fusionar" and nuevo not in vocabulario:
+        print(f"Error: No existe la etiqueta {nuevo}")
+        return
+
+    # Sólo cambia el vocabulario; las tareas siguen apuntando al mismo número
+    historial.preparar(DATA_FILE, _leer_datos(DATA_FILE))
+    vocabulario.renombrar(viejo, nuevo)
+    documento["etiquetas"] = vocabulario.nombres
+    _escribir_documento(documento, DATA_FILE)
+    historial.registrar_delta(DATA_FILE, {"renombres": [[viejo, nuevo]]},
+                              f"etiquetas {args.accion} {viejo} {nuevo}",
+                              _leer_datos(DATA_FILE))
+    if args.accion == "renombrar":
+        print(f"Etiqueta {viejo} renombrada a {nuevo}")
+    else:
+        print(f"Etiqueta {viejo} fusionada en {nuevo}")
+
+def cmd_deshacer(args):
+    """Manejador del comando deshacer: volver a un estado anterior."""
+    archivo = _archivo_agenda(args.agenda)
+    if archivo is None:
+        return
+    if historial.posicion_actual(archivo) is None:
+        print("Error: No hay historial de cambios")
+        return
+    # Un cambio hecho por fuera del historial es lo primero que se deshace
+    antes = _leer_datos(archivo)
+    historial.preparar(archivo, antes)
+    objetivo = historial.posicion_actual(archivo) - args.pasos
+    antigua = historial.revision_mas_antigua(archivo)
+    if objetivo < antigua:
+        print(f"Error: Sólo se puede deshacer hasta la revisión r{antigua}")
+        return
+
+    try:
+        datos = historial.reconstruir(archivo, objetivo)
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        return
+    _escribir_datos(datos, archivo)
+    historial.registrar(archivo, antes, datos,
+                        f"deshacer (r{objetivo})", restaura=objetivo)
+    print(f"Agenda restaurada al estado de la revisión r{objetivo}")
+
+def cmd_historial(args):
+    """Manejador del comando historial: listar los cambios registrados."""
+    archivo = _archivo_agenda(args.agenda)
+    if archivo is None:
+        return
+    entradas = historial.revisiones(archivo)
+    if not entradas:
+        print("No hay historial de cambios.")
+        return
+
+    actual = historial.posicion_actual(archivo)
+    for e in reversed(entradas[-args.limite:]):
+        cambios = (len(e.get("+", {})) + len(e.get("~", {})) + len(e.get("-", []))
+                   + len(e.get("renombres", []))
+                   if "estado" not in e else len(e["estado"]))
+        marca = "*" if e["rev"] == actual else " "
+        print(f"{marca} r{e['rev']} {e['fecha']} {e['motivo']} ({cambios} cambios)")
+    if actual not in {e["rev"] for e in entradas}:
+        print(f"* Estado actual: revisión r{actual}")
+
+def cmd_ver(args):
+    """Manejador del comando ver: mostrar la agenda en una revisión o fecha."""
+    archivo = _archivo_agenda(args.agenda)
+    if archivo is None:
+        return
+    try:
+        rev = historial.resolver(archivo, args.en)
+        datos = historial.reconstruir(archivo, rev)
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        return
+
+    print(f"Agenda en la revisión r{rev}:")
+    if not datos:
+        print("No hay tareas.")
+        return
+    tareas = (Tarea.from_dict(d) for d in datos)
+    if args.agenda:
+        # Mismos ids que en las consultas con --espacio
+        tareas = espacio.con_espacio(tareas, args.agenda)
+    _imprimir_tareas(tareas)
+
+def _opcion_agenda(parser):
+    """Agregar la opción para trabajar sobre una agenda del espacio."""
+    parser.add_argument("--agenda", metavar="NOMBRE",
+                        help="Agenda del espacio de trabajo (por defecto, la local)")
+
+def _opciones_espacio(parser):
+    """Agregar las opciones para consultar todas las agendas del espacio."""
+    parser.add_argument("--espacio", action="store_true",
+                        help="Consultar todas las agendas registradas")
+    parser.add_argument("--procesos", action="store_true",
+                        help="Con --espacio, usar procesos en lugar de hilos")
+
 def main():
     parser = argparse.ArgumentParser(prog="agenda", description="Gestor de tareas")
     sub = parser.add_subparsers(dest="cmd", required=True)
@@ -169,17 +594,34 @@ def main():
     a.add_argument("--prioridad", type=int, required=True, choices=range(1,6))
     a.add_argument("--etiquetas")
     a.add_argument("--descripcion", default="")
+    a.add_argument("--repetir", choices=FRECUENCIAS,
+                   help="Repetir la tarea a partir de --fecha")
+    a.add_argument("--cada", type=entero_positivo,
+                   help="Intervalo de repetición (ej. 2 = cada 2 semanas; por defecto 1)")
+    a.add_argument("--repetir-hasta", type=fecha_arg,
+                   help="Última fecha de repetición")
+    a.add_argument("--veces", type=entero_positivo,
+                   help="Número total de repeticiones")
     a.set_defaults(func=cmd_add)
 
     # Comando ls
     l = sub.add_parser("ls", help="Listar tareas")
     l.add_argument("--por", choices=["fecha","prioridad","id"],
                    help="Ordenar por un campo")
+    l.add_argument("--desde", type=fecha_arg,
+                   help="Mostrar desde esta fecha (expande recurrentes)")
+    l.add_argument("--hasta", type=fecha_arg,
+                   help="Mostrar hasta esta fecha (expande recurrentes)")
+    l.add_argument("--memoria", type=entero_positivo,
+                   help="Tareas a ordenar en memoria antes de usar archivos "
+                        f"temporales (por defecto {LIMITE_MEMORIA})")
+    _opciones_espacio(l)
     l.set_defaults(func=cmd_ls)
 
     # Comando find
     f = sub.add_parser("find", help="Buscar término en título o descripción")
     f.add_argument("termino", help="Cadena a buscar")
+    _opciones_espacio(f)
     f.set_defaults(func=cmd_find)
 
     # Comando done
@@ -187,6 +629,15 @@ def main():
     d.add_argument("id", help="ID de la tarea a marcar como hecha")
     d.set_defaults(func=cmd_done)
 
+    # Comando stats
+    st = sub.add_parser("stats", help="Resumen de la agenda")
+    st.add_argument("--desde", type=fecha_arg,
+                    help="Contar desde esta fecha (expande recurrentes)")
+    st.add_argument("--hasta", type=fecha_arg,
+                    help="Contar hasta esta fecha (expande recurrentes)")
+    _opciones_espacio(st)
+    st.set_defaults(func=cmd_stats)
+
     # Comando rm
     r = sub.add_parser("rm", help="Eliminar tarea")
     r.add_argument("id", help="ID de la tarea a eliminar")
@@ -202,7 +653,57 @@ def main():
     lo.add_argument("archivo", help="Archivo desde donde cargar las tareas")
     lo.set_defaults(func=cmd_load)
 
+    # Comando etiquetas
+    et = sub.add_parser("etiquetas", help="Administrar el vocabulario de etiquetas")
+    et_sub = et.add_subparsers(dest="accion", required=True)
+    et_sub.add_parser("ls", help="Listar etiquetas y cuántas tareas las usan")
+    et_r = et_sub.add_parser("renombrar", help="Cambiar el nombre de una etiqueta")
+    et_r.add_argument("viejo", help="Nombre actual")
+    et_r.add_argument("nuevo", help="Nombre nuevo")
+    et_f = et_sub.add_parser("fusionar", help="Unir una etiqueta con otra existente")
+    et_f.add_argument("viejo", help="Etiqueta que desaparece")
+    et_f.add_argument("nuevo", help="Etiqueta que la absorbe")
+    et.set_defaults(func=cmd_etiquetas)
+
+    # Comando espacio
+    es = sub.add_parser("espacio", help="Administrar las agendas del espacio de trabajo")
+    es_sub = es.add_subparsers(dest="accion", required=True)
+    es_sub.add_parser("ls", help="Listar las agendas registradas")
+    es_a = es_sub.add_parser("add", help="Registrar una agenda")
+    es_a.add_argument("nombre", help="Nombre corto (prefijo de sus ids)")
+    es_a.add_argument("ruta", help="Archivo de datos de la agenda")
+    es_r = es_sub.add_parser("rm", help="Quitar una agenda del espacio")
+    es_r.add_argument("nombre", help="Nombre de la agenda")
+    es.set_defaults(func=cmd_espacio)
+
+    # Comando deshacer
+    de = sub.add_parser("deshacer", help="Deshacer el último cambio")
+    de.add_argument("--pasos", type=entero_positivo, default=1,
+                    help="Número de cambios a deshacer")
+    _opcion_agenda(de)
+    de.set_defaults(func=cmd_deshacer)
+
+    # Comando historial
+    h = sub.add_parser("historial", help="Listar los cambios registrados")
+    h.add_argument("--limite", type=entero_positivo, default=20,
+                   help="Número máximo de revisiones a mostrar")
+    _opcion_agenda(h)
+    h.set_defaults(func=cmd_historial)
+
+    # Comando ver
+    v = sub.add_parser("ver", help="Ver la agenda en un punto del historial")
+    v.add_argument("--en", required=True,
+                   help="Revisión (r12) o fecha (AAAA-MM-DD o AAAA-MM-DDTHH:MM)")
+    _opcion_agenda(v)
+    v.set_defaults(func=cmd_ver)
+
     args = parser.parse_args()
+    if args.cmd == "add" and not args.repetir and (
+            args.cada or args.veces or args.repetir_hasta):
+        a.error("--cada, --veces y --repetir-hasta requieren --repetir")
+    if args.cmd == "ls" and args.espacio and args.memoria:
+        # Cada agenda del espacio se ordena completa en memoria
+        l.error("--memoria no se puede combinar con --espacio")
     args.func(args)
 
 if __name__ == "__main__":
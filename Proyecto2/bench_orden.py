@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""
+Medición del pico de memoria al ordenar agendas grandes.
+
+Genera agendas de tamaño creciente en un directorio temporal y ejecuta
+``agenda.py ls --por fecha`` y ``export_html.py`` como procesos hijos,
+tomando el pico de memoria residente (RSS) de cada uno con os.wait4.
+
+Cada comando se mide dos veces: con el límite de memoria indicado (el
+ordenamiento externo entra en juego al pasarlo) y con un límite mayor que la
+agenda (todo en memoria, como antes). Con el ordenamiento externo el pico
+debe mantenerse casi plano mientras la agenda crece.
+
+Uso:
+    python bench_orden.py [--tamanos 50000 100000 200000] [--memoria 20000]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+ETIQUETAS = ["trabajo", "casa", "urgente", "compras", "salud", "estudio"]
+
+
+def generar_agenda(ruta, n, semilla=0):
+    """
+    Escribe una agenda sintética de `n` tareas en formato versión 2.
+
+    Las tareas se escriben una a una para no armar la agenda en memoria.
+
+    Args:
+        ruta (str): Archivo de datos a crear.
+        n (int): Número de tareas.
+        semilla (int): Semilla para que las agendas sean reproducibles.
+    """
+    azar = random.Random(semilla)
+    inicio = date(2026, 1, 1)
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write('{"version": 2, "etiquetas": ')
+        json.dump(ETIQUETAS, f)
+        f.write(', "tareas": [')
+        for i in range(n):
+            tarea = {
+                "id": f"T-{i + 1:07d}",
+                "titulo": f"Tarea {i + 1}",
+                "prioridad": azar.randint(1, 5),
+                "fecha": (inicio + timedelta(days=azar.randrange(730))).isoformat(),
+                "etiquetas": azar.sample(range(len(ETIQUETAS)), azar.randint(0, 2)),
+                "descripcion": "Descripción de prueba",
+                "completada": azar.random() < 0.3,
+            }
+            f.write(("," if i else "") + json.dumps(tarea, ensure_ascii=False))
+        f.write("]}")
+
+
+def medir(comando, directorio):
+    """
+    Ejecuta un comando y mide su pico de memoria.
+
+    Args:
+        comando (list): Argumentos del proceso hijo.
+        directorio (str): Directorio de trabajo del hijo.
+
+    Returns:
+        tuple: (pico de RSS en MiB, segundos transcurridos).
+    """
+    inicio = time.perf_counter()
+    with open(os.devnull, "w") as nulo:
+        proceso = subprocess.Popen(comando, cwd=directorio, stdout=nulo)
+        _, estado, uso = os.wait4(proceso.pid, 0)
+        proceso.returncode = os.waitstatus_to_exitcode(estado)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"Falló: {' '.join(comando)}")
+    # En Linux ru_maxrss está en KiB (en macOS, en bytes)
+    factor = 1 if sys.platform == "darwin" else 1024
+    return uso.ru_maxrss * factor / 2**20, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pico de memoria al ordenar agendas grandes")
+    parser.add_argument("--tamanos", type=int, nargs="+",
+                        default=[50_000, 100_000, 200_000, 400_000],
+                        help="Número de tareas de cada agenda")
+    parser.add_argument("--memoria", type=int, default=20_000,
+                        help="Límite del ordenamiento externo (tareas en memoria)")
+    args = parser.parse_args()
+
+    agenda = os.path.join(AQUI, "agenda.py")
+    export = os.path.join(AQUI, "export_html.py")
+    ilimitado = str(max(args.tamanos) + 1)
+    casos = [
+        ("ls --por fecha", [sys.executable, agenda, "ls", "--por", "fecha", "--memoria"]),
+        ("export_html", [sys.executable, export, "--memoria"]),
+    ]
+
+    print(f"{'tareas':>9}  {'comando':<16}{'externo MiB':>12}{'s':>7}"
+          f"{'memoria MiB':>13}{'s':>7}")
+    with tempfile.TemporaryDirectory(prefix="agenda-bench-") as directorio:
+        for n in args.tamanos:
+            generar_agenda(os.path.join(directorio, ".tareas.json"), n)
+            for nombre, comando in casos:
+                rss_ext, t_ext = medir(comando + [str(args.memoria)], directorio)
+                rss_mem, t_mem = medir(comando + [ilimitado], directorio)
+                print(f"{n:>9}  {nombre:<16}{rss_ext:>12.1f}{t_ext:>7.1f}"
+                      f"{rss_mem:>13.1f}{t_mem:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
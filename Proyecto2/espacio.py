@@ -0,0 +1,128 @@
+"""
+Módulo espacio.py
+
+Espacio de trabajo con varias agendas (por ejemplo, una por equipo).
+
+Las agendas se registran en ``.agenda-espacio.json`` con un nombre corto. Ese
+nombre sirve de espacio de nombres para los ids: la tarea T-0001 de la agenda
+"ventas" se identifica como "ventas:T-0001".
+
+Las consultas se ejecutan en paralelo, una por agenda, con un pool de hilos
+(o de procesos) y los resultados ya ordenados se combinan con una mezcla de k
+vías (heapq.merge), sin concatenarlos para volver a ordenarlos.
+"""
+
+import heapq
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Archivo por defecto con el registro de agendas
+ESPACIO_FILE = ".agenda-espacio.json"
+
+_PATRON_NOMBRE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def cargar_espacio(archivo=ESPACIO_FILE):
+    """
+    Carga el registro de agendas.
+
+    Args:
+        archivo (str): Ruta del registro.
+
+    Returns:
+        dict: Nombre -> ruta del archivo de datos, en orden de registro.
+            Las rutas relativas se resuelven respecto al registro.
+    """
+    if not os.path.exists(archivo):
+        return {}
+    with open(archivo, "r", encoding="utf-8") as f:
+        datos = json.load(f)
+    base = os.path.dirname(os.path.abspath(archivo))
+    return {nombre: os.path.normpath(os.path.join(base, ruta))
+            for nombre, ruta in datos.get("agendas", {}).items()}
+
+
+def guardar_espacio(agendas, archivo=ESPACIO_FILE):
+    """
+    Guarda el registro de agendas con rutas relativas al propio registro.
+
+    Args:
+        agendas (dict): Nombre -> ruta del archivo de datos.
+        archivo (str): Ruta del registro.
+    """
+    base = os.path.dirname(os.path.abspath(archivo))
+    datos = {"agendas": {nombre: os.path.relpath(os.path.abspath(ruta), base)
+                         for nombre, ruta in agendas.items()}}
+    with open(archivo, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+
+
+def validar_nombre(nombre):
+    """
+    Valida el nombre de una agenda (se usa como prefijo de los ids).
+
+    Raises:
+        ValueError: Si el nombre contiene caracteres no permitidos.
+    """
+    if not _PATRON_NOMBRE.match(nombre):
+        raise ValueError("El nombre de la agenda sólo puede tener letras, "
+                         "números, '.', '-' y '_'.")
+    return nombre
+
+
+def con_espacio(tareas, nombre):
+    """
+    Antepone el nombre de la agenda a los ids de sus tareas.
+
+    Args:
+        tareas (iterable): Tareas cargadas de la agenda.
+        nombre (str): Nombre de la agenda en el espacio.
+
+    Yields:
+        Tarea: Las mismas tareas con id '<nombre>:<id>'.
+    """
+    for t in tareas:
+        t.id = f"{nombre}:{t.id}"
+        yield t
+
+
+def consultar(funcion, agendas, *args, procesos=False):
+    """
+    Ejecuta `funcion(nombre, ruta, *args)` sobre cada agenda en paralelo.
+
+    Args:
+        funcion (callable): Consulta a ejecutar; con procesos debe poder
+            serializarse (función definida a nivel de módulo).
+        agendas (dict): Nombre -> ruta, como devuelve cargar_espacio.
+        *args: Argumentos adicionales para la consulta.
+        procesos (bool): Usar un pool de procesos en lugar de hilos.
+
+    Returns:
+        list: Resultado de cada agenda, en el orden del registro.
+    """
+    if not agendas:
+        return []
+    pool = ProcessPoolExecutor if procesos else ThreadPoolExecutor
+    nombres = list(agendas)
+    with pool(max_workers=min(len(nombres), os.cpu_count() or 1)) as ejecutor:
+        futuros = [ejecutor.submit(funcion, n, agendas[n], *args) for n in nombres]
+        return [f.result() for f in futuros]
+
+
+def fusionar(flujos, clave=None):
+    """
+    Combina flujos ya ordenados en uno solo, con una mezcla de k vías.
+
+    Los empates se resuelven en el orden de los flujos, así que el
+    resultado es estable igual que un sort sobre la concatenación.
+
+    Args:
+        flujos (list[iterable]): Secuencias ordenadas por `clave`.
+        clave (callable, opcional): Función de ordenamiento.
+
+    Returns:
+        iterator: Elementos de todos los flujos, en orden.
+    """
+    return heapq.merge(*flujos, key=clave)
@@ -0,0 +1,154 @@
+"""
+Módulo etiquetas.py
+
+Vocabulario de etiquetas compartido por todas las tareas.
+
+En el archivo de datos las etiquetas se guardan una sola vez, en la cabecera,
+y cada tarea las referencia por número::
+
+    {"version": 2,
+     "etiquetas": ["trabajo", "urgente", ...],
+     "tareas": [{"id": "T-0001", ..., "etiquetas": [0, 1]}, ...]}
+
+En memoria, las etiquetas de una tarea son una tupla inmutable internada: las
+tareas con la misma combinación de etiquetas comparten el mismo objeto.
+"""
+
+import sys
+
+VERSION = 2
+
+# Tabla global de tuplas internadas: combinación -> tupla compartida
+_TUPLAS = {}
+
+
+def internar(etiquetas):
+    """
+    Devuelve la tupla compartida para una secuencia de etiquetas.
+
+    Las cadenas se internan con sys.intern y se eliminan repetidas
+    conservando el orden.
+
+    Args:
+        etiquetas (iterable[str] | None): Etiquetas de una tarea.
+
+    Returns:
+        tuple[str]: Tupla inmutable compartida.
+    """
+    clave = tuple(etiquetas) if etiquetas else ()
+    tupla = _TUPLAS.get(clave)
+    if tupla is None:
+        tupla = tuple(dict.fromkeys(sys.intern(e) for e in clave))
+        tupla = _TUPLAS.setdefault(tupla, tupla)
+        _TUPLAS[clave] = tupla
+    return tupla
+
+
+class Vocabulario:
+    """
+    Diccionario de etiquetas de un archivo de datos.
+
+    Atributos:
+        nombres (list[str]): Nombre de cada etiqueta según su número. Puede
+            haber nombres repetidos tras fusionar dos etiquetas; se
+            compactan al volver a guardar las tareas.
+    """
+
+    def __init__(self, nombres=None):
+        """
+        Inicializa el vocabulario.
+
+        Args:
+            nombres (list[str], opcional): Nombres guardados en la cabecera.
+        """
+        self.nombres = [sys.intern(n) for n in nombres] if nombres else []
+        self._numeros = {}
+        for i, nombre in enumerate(self.nombres):
+            self._numeros.setdefault(nombre, i)
+        self._tuplas = {}
+
+    def numero(self, nombre):
+        """Número de una etiqueta, agregándola al vocabulario si es nueva."""
+        i = self._numeros.get(nombre)
+        if i is None:
+            i = len(self.nombres)
+            self.nombres.append(sys.intern(nombre))
+            self._numeros[nombre] = i
+        return i
+
+    def tupla(self, numeros):
+        """
+        Convierte los números de etiqueta de una tarea en su tupla internada.
+
+        Raises:
+            ValueError: Si algún número no existe en el vocabulario.
+        """
+        clave = tuple(numeros)
+        tupla = self._tuplas.get(clave)
+        if tupla is None:
+            try:
+                tupla = internar(self.nombres[i] for i in clave)
+            except (IndexError, TypeError) as exc:
+                raise ValueError(f"Etiqueta desconocida en {list(clave)}.") from exc
+            self._tuplas[clave] = tupla
+        return tupla
+
+    def renombrar(self, viejo, nuevo):
+        """
+        Cambia el nombre de una etiqueta editando sólo el vocabulario.
+
+        Si `nuevo` ya existe, las dos etiquetas quedan fusionadas.
+
+        Raises:
+            KeyError: Si `viejo` no está en el vocabulario.
+        """
+        indices = [i for i, n in enumerate(self.nombres) if n == viejo]
+        if not indices:
+            raise KeyError(viejo)
+        for i in indices:
+            self.nombres[i] = sys.intern(nuevo)
+        del self._numeros[viejo]
+        self._numeros.setdefault(nuevo, indices[0])
+        self._tuplas.clear()
+
+    def __contains__(self, nombre):
+        return nombre in self._numeros
+
+
+def codificar(datos):
+    """
+    Convierte una lista de tareas (diccionarios) al formato con cabecera.
+
+    Args:
+        datos (list[dict]): Tareas con etiquetas como cadenas.
+
+    Returns:
+        dict: Documento listo para guardarse en JSON.
+    """
+    vocabulario = Vocabulario()
+    tareas = []
+    for d in datos:
+        d = dict(d)
+        d["etiquetas"] = [vocabulario.numero(e) for e in d.get("etiquetas", ())]
+        tareas.append(d)
+    return {"version": VERSION, "etiquetas": vocabulario.nombres, "tareas": tareas}
+
+
+def decodificar(documento):
+    """
+    Convierte un documento leído del archivo en una lista de tareas.
+
+    Acepta también el formato anterior (una lista de tareas con las
+    etiquetas escritas en cada una).
+
+    Args:
+        documento (dict | list): Contenido JSON del archivo de datos.
+
+    Returns:
+        list[dict]: Tareas con las etiquetas como tuplas internadas.
+    """
+    if isinstance(documento, list):
+        return [{**d, "etiquetas": internar(d.get("etiquetas"))} for d in documento]
+    vocabulario = Vocabulario(documento.get("etiquetas"))
+    return [{**d, "etiquetas": vocabulario.tupla(d.get("etiquetas", ()))}
+            for d in documento["tareas"]]
@@ -2,10 +2,31 @@
 """
 Genera un archivo index.html desde las tareas almacenadas en .tareas.json.
 Usa agenda.py para cargar las tareas.
+
+Con --virtual se genera en cambio una página ligera que carga las tareas por
+bloques (chunks) desde el directorio datos/ y sólo dibuja las filas visibles.
 """
 
+import argparse
+import filecmp
+import json
 import os
-from agenda import cargar_tareas 
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from itertools import islice
+import espacio
+from agenda import (DATA_FILE, cargar_tareas, entero_positivo, expandir, fecha_arg,
+                    iterar_tareas, ventana_de_args)
+from orden_externo import LIMITE_MEMORIA, OrdenadorExterno
+from vigilancia import Vigilante
+
+# Directorio y tamaño por defecto de los bloques del modo virtual
+DIR_DATOS = "datos"
+TAM_CHUNK = 200
+# Nombre de los bloques: sección y número de bloque sin ceros a la izquierda
+_PATRON_CHUNK = re.compile(r"^(pendientes|completadas)-\d+\.js$")
 
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="es">
@@ -28,61 +49,402 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 </html>
 """
 
-def generar_html():
-    """Carga, clasifica, ordena las tareas y genera el archivo index.html."""
-    try:
-        tareas = cargar_tareas()
-    except FileNotFoundError:
-        tareas = []
-    
-    if not tareas:
-        content = "<section class='vacio'><h2>La agenda está vacía.</h2><p>No hay tareas registradas para mostrar.</p></section>"
-    else:
-        # Sorteo de las tareas
-        tareas.sort(key=lambda t: t.prioridad * -1) 
+VIRTUAL_TEMPLATE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <title>Agenda de Tareas</title>
+    <link rel="stylesheet" href="styles.css">
+</head>
+<body>
+    <header>
+        <h1>Agenda de Tareas</h1>
+    </header>
 
-        #separación de las secciones
-        pendientes = [t for t in tareas if not t.completada]
-        completadas = [t for t in tareas if t.completada]
-        
-        # Contador
-        contador_pendientes = len(pendientes)
-        contador_completadas = len(completadas)
-        
-        # Generar contenido HTML para las secciones
-        
-        seccion_pendientes = f"""
-            <section id="pendientes" class="seccion-tareas">
-                <h2>Pendientes ({contador_pendientes})</h2>
-                <div class="lista-tareas">
-                    {_generar_filas_html(pendientes) if pendientes else '<p class="mensaje-seccion">¡Todo al día en esta categoría!</p>'}
-                </div>
-            </section>
-        """
+    <div class="filtros">
+        <input id="filtro-texto" type="search" placeholder="Filtrar por título, etiqueta o descripción">
+        <select id="filtro-prioridad">
+            <option value="">Todas las prioridades</option>
+            <option value="5">P5</option>
+            <option value="4">P4</option>
+            <option value="3">P3</option>
+            <option value="2">P2</option>
+            <option value="1">P1</option>
+        </select>
+    </div>
+
+    <main id="contenido"></main>
+
+    <footer>
+        <p>Generado automáticamente por export_html.py</p>
+    </footer>
+
+    <script>
+    (function () {
+        "use strict";
+
+        var ALTO_FILA = 190;   // alto de la fila (175px de tarjeta + separación)
+        var MARGEN_FILAS = 5;  // filas extra dibujadas fuera de la vista
+        var TITULOS = {pendientes: "Pendientes", completadas: "Completadas"};
+        var VACIOS = {
+            pendientes: "¡Todo al día en esta categoría!",
+            completadas: "Aún no hay tareas finalizadas."
+        };
+
+        var manifiesto = null;
+        var secciones = {};
+        var filtro = {texto: "", prioridad: ""};
+
+        function crear(etiqueta, clase, texto) {
+            var el = document.createElement(etiqueta);
+            if (clase) { el.className = clase; }
+            if (texto !== undefined) { el.textContent = texto; }
+            return el;
+        }
+
+        function cargarChunk(sec, n) {
+            if (sec.chunks[n] || sec.cargando[n]) { return; }
+            sec.cargando[n] = true;
+            var s = document.createElement("script");
+            s.src = manifiesto.directorio + "/" + sec.nombre + "-" + n + ".js";
+            document.body.appendChild(s);
+        }
+
+        // Los bloques se publican como scripts para que funcionen con file://
+        window.agendaChunk = function (nombre, n, filas) {
+            var sec = secciones[nombre];
+            if (!sec) { return; }
+            sec.chunks[n] = filas;
+            delete sec.cargando[n];
+            if (hayFiltro()) { aplicarFiltro(sec); } else { dibujar(sec); }
+        };
+
+        window.agendaManifiesto = function (m) {
+            manifiesto = m;
+            var cont = document.getElementById("contenido");
+            var total = 0;
+            m.secciones.forEach(function (s) { total += s.total; });
+            if (total === 0) {
+                var vacio = crear("section", "vacio");
+                vacio.appendChild(crear("h2", "", "La agenda está vacía."));
+                vacio.appendChild(crear("p", "", "No hay tareas registradas para mostrar."));
+                cont.appendChild(vacio);
+                document.querySelector(".filtros").style.display = "none";
+                return;
+            }
+            m.secciones.forEach(function (s) {
+                var sec = {
+                    nombre: s.nombre, total: s.total, chunks: [], cargando: {},
+                    indices: null, pendienteDibujo: false
+                };
+                var nodo = crear("section", "seccion-tareas");
+                nodo.id = s.nombre;
+                sec.titulo = crear("h2");
+                nodo.appendChild(sec.titulo);
+                sec.lista = crear("div", "lista-tareas virtual");
+                sec.espaciador = crear("div", "espaciador");
+                sec.lista.appendChild(sec.espaciador);
+                sec.mensaje = crear("p", "mensaje-seccion", VACIOS[s.nombre]);
+                nodo.appendChild(sec.lista);
+                nodo.appendChild(sec.mensaje);
+                sec.lista.addEventListener("scroll", function () { programar(sec); });
+                cont.appendChild(nodo);
+                secciones[s.nombre] = sec;
+                dibujar(sec);
+            });
+        };
+
+        function hayFiltro() {
+            return filtro.texto !== "" || filtro.prioridad !== "";
+        }
+
+        function coincide(fila) {
+            // fila = [id, titulo, prioridad, fecha, etiquetas, descripcion]
+            if (filtro.prioridad !== "" && String(fila[2]) !== filtro.prioridad) {
+                return false;
+            }
+            if (filtro.texto === "") { return true; }
+            var texto = (fila[1] + " " + fila[4].join(" ") + " " + fila[5]).toLowerCase();
+            return texto.indexOf(filtro.texto) !== -1;
+        }
+
+        function aplicarFiltro(sec) {
+            if (!hayFiltro()) {
+                sec.indices = null;
+                dibujar(sec);
+                return;
+            }
+            // Filtrar requiere todos los bloques de la sección
+            var faltan = false;
+            for (var n = 0; n < Math.ceil(sec.total / manifiesto.tam_chunk); n++) {
+                if (!sec.chunks[n]) { faltan = true; cargarChunk(sec, n); }
+            }
+            if (faltan) {
+                sec.indices = [];
+                sec.titulo.textContent = TITULOS[sec.nombre] + " (cargando…)";
+                return;
+            }
+            var indices = [];
+            for (var i = 0; i < sec.total; i++) {
+                if (coincide(fila(sec, i))) { indices.push(i); }
+            }
+            sec.indices = indices;
+            sec.lista.scrollTop = 0;
+            dibujar(sec);
+        }
+
+        function fila(sec, i) {
+            var chunk = sec.chunks[Math.floor(i / manifiesto.tam_chunk)];
+            return chunk ? chunk[i % manifiesto.tam_chunk] : null;
+        }
+
+        function programar(sec) {
+            if (sec.pendienteDibujo) { return; }
+            sec.pendienteDibujo = true;
+            window.requestAnimationFrame(function () {
+                sec.pendienteDibujo = false;
+                dibujar(sec);
+            });
+        }
+
+        function tarjeta(datos, completada) {
+            var clase = completada ? "completada" : "pendiente";
+            var t = crear("div", "tarea " + clase + " prioridad-" + datos[2]);
+            var cab = crear("div", "header-tarea");
+            cab.appendChild(crear("h3", "titulo", datos[1]));
+            cab.appendChild(crear("span", "prioridad p-" + datos[2], "P" + datos[2]));
+            t.appendChild(cab);
+            var cuerpo = crear("div", "cuerpo-tarea");
+            var campos = [
+                ["", "Fecha límite:", datos[3]],
+                ["etiquetas", "Etiquetas:", datos[4].length ? datos[4].join(", ") : "—"],
+                ["descripcion", "Descripción:", datos[5] || "Sin descripción"]
+            ];
+            campos.forEach(function (c) {
+                var p = crear("p", c[0]);
+                p.appendChild(crear("strong", "", c[1]));
+                p.appendChild(document.createTextNode(" " + c[2]));
+                cuerpo.appendChild(p);
+            });
+            t.appendChild(cuerpo);
+            t.appendChild(crear("span", "estado-final", completada ? "Completada" : "Pendiente"));
+            return t;
+        }
+
+        function dibujar(sec) {
+            var cuenta = sec.indices ? sec.indices.length : sec.total;
+            sec.titulo.textContent = TITULOS[sec.nombre] + " (" +
+                (sec.indices ? cuenta + " de " + sec.total : cuenta) + ")";
+            sec.lista.style.display = cuenta ? "" : "none";
+            sec.mensaje.style.display = cuenta ? "none" : "";
+            sec.espaciador.style.height = (cuenta * ALTO_FILA) + "px";
+
+            var arriba = sec.lista.scrollTop;
+            var primera = Math.max(0, Math.floor(arriba / ALTO_FILA) - MARGEN_FILAS);
+            var ultima = Math.min(cuenta,
+                Math.ceil((arriba + sec.lista.clientHeight) / ALTO_FILA) + MARGEN_FILAS);
+
+            var fragmento = document.createDocumentFragment();
+            for (var i = primera; i < ultima; i++) {
+                var pos = sec.indices ? sec.indices[i] : i;
+                var datos = fila(sec, pos);
+                var nodo;
+                if (datos) {
+                    nodo = tarjeta(datos, sec.nombre === "completadas");
+                } else {
+                    cargarChunk(sec, Math.floor(pos / manifiesto.tam_chunk));
+                    nodo = crear("div", "tarea", "Cargando…");
+                }
+                nodo.style.top = (i * ALTO_FILA) + "px";
+                fragmento.appendChild(nodo);
+            }
+            sec.espaciador.textContent = "";
+            sec.espaciador.appendChild(fragmento);
+        }
+
+        var espera = null;
+        function alCambiarFiltro() {
+            window.clearTimeout(espera);
+            espera = window.setTimeout(function () {
+                filtro.texto = document.getElementById("filtro-texto").value.trim().toLowerCase();
+                filtro.prioridad = document.getElementById("filtro-prioridad").value;
+                Object.keys(secciones).forEach(function (k) { aplicarFiltro(secciones[k]); });
+            }, 150);
+        }
+        document.getElementById("filtro-texto").addEventListener("input", alCambiarFiltro);
+        document.getElementById("filtro-prioridad").addEventListener("change", alCambiarFiltro);
+    })();
+    </script>
+    <script src="datos/manifiesto.js"
+            onerror="document.getElementById('contenido').textContent = 'No se encontraron los datos exportados (datos/manifiesto.js).';"></script>
+</body>
+</html>
+"""
+
+
+def _clasificar(tareas):
+    """Ordena las tareas por prioridad descendente y las separa por estado.
+
+    Args:
+        tareas (list): Lista de objetos Tarea.
+
+    Returns:
+        tuple: (pendientes, completadas), ambas listas ordenadas.
+    """
+    # Sorteo de las tareas
+    tareas.sort(key=lambda t: t.prioridad * -1)
+
+    #separación de las secciones
+    pendientes = [t for t in tareas if not t.completada]
+    completadas = [t for t in tareas if t.completada]
+    return pendientes, completadas
+
+@contextmanager
+def _clasificado(tareas, limite):
+    """Separa un flujo de tareas por estado y las ordena por prioridad.
+
+    Equivale a _clasificar, pero con OrdenadorExterno: si hay más de
+    `limite` tareas en una sección, se ordenan en archivos temporales.
+
+    Args:
+        tareas (iterable): Flujo de objetos Tarea.
+        limite (int): Tareas que se ordenan en memoria.
+
+    Yields:
+        tuple: (pendientes, completadas) como OrdenadorExterno.
+    """
+    clave = lambda t: t.prioridad * -1
+    with OrdenadorExterno(clave, limite) as pendientes, \
+            OrdenadorExterno(clave, limite) as completadas:
+        for t in tareas:
+            (completadas if t.completada else pendientes).agregar(t)
+        yield pendientes, completadas
+
+def generar_html(ventana=None, limite=LIMITE_MEMORIA):
+    """Carga, clasifica, ordena las tareas y genera el archivo index.html.
 
-        seccion_completadas = f"""
-            <section id="completadas" class="seccion-tareas">
-                <h2>Completadas ({contador_completadas})</h2>
+    Las tareas se leen en flujo y la página se escribe por partes, así que
+    con más de `limite` tareas la memoria usada se mantiene acotada.
+
+    Args:
+        ventana (tuple, opcional): (desde, hasta) como date; si se indica,
+            sólo se exportan las tareas de ese periodo y las tareas
+            recurrentes se expanden en sus ocurrencias.
+        limite (int, opcional): Tareas que se ordenan en memoria.
+
+    Returns:
+        tuple: (archivos reescritos, archivos generados).
+    """
+    with _clasificado(_flujo(ventana), limite) as (pendientes, completadas):
+        if not pendientes and not completadas:
+            content = "<section class='vacio'><h2>La agenda está vacía.</h2><p>No hay tareas registradas para mostrar.</p></section>"
+            partes = [HTML_TEMPLATE.format(content=content)]
+        else:
+            cabecera, pie = HTML_TEMPLATE.split("{content}")
+            partes = _encadenar([cabecera], _partes_secciones(pendientes, completadas), [pie])
+        escrito = _escribir_atomico("index.html", partes)
+
+    print("Archivo 'index.html' generado correctamente.")
+    return int(escrito), 1
+
+def generar_html_espacio(ventana=None, procesos=False):
+    """Genera un index.html combinado con una sección por agenda del espacio.
+
+    Las agendas registradas (ver espacio.py) se cargan y clasifican en
+    paralelo; cada una conserva sus propias secciones de pendientes y
+    completadas.
+
+    Args:
+        ventana (tuple, opcional): (desde, hasta), igual que en generar_html.
+        procesos (bool): Usar un pool de procesos en lugar de hilos.
+
+    Returns:
+        tuple: (archivos reescritos, archivos generados).
+    """
+    agendas = espacio.cargar_espacio()
+    if not agendas:
+        print("Error: No hay agendas registradas (usa 'agenda.py espacio add').")
+        return 0, 0
+    clasificadas = espacio.consultar(_consulta_export, agendas, ventana,
+                                     procesos=procesos)
+
+    indice = []
+    secciones = []
+    for nombre, (pendientes, completadas) in zip(agendas, clasificadas):
+        indice.append(f'<li><a href="#agenda-{nombre}">{nombre}</a> '
+                      f'({len(pendientes)} pendientes, {len(completadas)} completadas)</li>')
+        secciones.append(f"""
+        <section id="agenda-{nombre}" class="agenda-espacio">
+            <h2>{nombre}</h2>
+            {_secciones_html(pendientes, completadas, prefijo=f"{nombre}-")}
+        </section>
+        """)
+    content = (f'<nav class="indice-espacio"><ul>{"".join(indice)}</ul></nav>'
+               + "".join(secciones))
+
+    escrito = _escribir_atomico("index.html", HTML_TEMPLATE.format(content=content))
+
+    print(f"Archivo 'index.html' generado correctamente con {len(agendas)} agendas.")
+    return int(escrito), 1
+
+def _consulta_export(nombre, ruta, ventana):
+    """Carga y clasifica una agenda del espacio (se ejecuta en el pool)."""
+    tareas = list(espacio.con_espacio(_cargar(ventana, ruta), nombre))
+    return _clasificar(tareas)
+
+def _secciones_html(pendientes, completadas, prefijo=""):
+    """Genera las secciones de pendientes y completadas.
+
+    Args:
+        pendientes (list): Tareas pendientes, ya ordenadas.
+        completadas (list): Tareas completadas, ya ordenadas.
+        prefijo (str, opcional): Prefijo de los ids de sección, para que no
+            se repitan cuando hay varias agendas en la misma página.
+
+    Returns:
+        str: HTML de ambas secciones.
+    """
+    return "".join(_partes_secciones(pendientes, completadas, prefijo))
+
+def _partes_secciones(pendientes, completadas, prefijo=""):
+    """Genera por partes el HTML de las secciones, sin armarlo completo.
+
+    Args:
+        pendientes: Tareas pendientes ordenadas (lista u OrdenadorExterno).
+        completadas: Tareas completadas ordenadas.
+        prefijo (str, opcional): Prefijo de los ids de sección.
+
+    Yields:
+        str: Fragmentos consecutivos del HTML.
+    """
+    secciones = (
+        ("pendientes", "Pendientes", pendientes, "¡Todo al día en esta categoría!"),
+        ("completadas", "Completadas", completadas, "Aún no hay tareas finalizadas."),
+    )
+    for id_, titulo, tareas, mensaje in secciones:
+        # Contador
+        yield f"""
+            <section id="{prefijo}{id_}" class="seccion-tareas">
+                <h2>{titulo} ({len(tareas)})</h2>
                 <div class="lista-tareas">
-                    {_generar_filas_html(completadas) if completadas else '<p class="mensaje-seccion">Aún no hay tareas finalizadas.</p>'}
+                    """
+        if tareas:
+            yield from _generar_filas_html(tareas)
+        else:
+            yield f'<p class="mensaje-seccion">{mensaje}</p>'
+        yield """
                 </div>
             </section>
         """
-        
-        content = seccion_pendientes + seccion_completadas
-
-    with open("index.html", "w", encoding="utf-8") as f:
-        f.write(HTML_TEMPLATE.format(content=content))
-
-    print("Archivo 'index.html' generado correctamente.")
 
 def _generar_filas_html(tareas):
-    """Genera el HTML para una lista de tareas."""
-    filas = []
-    for t in tareas:
+    """Genera el HTML para una lista de tareas, una fila a la vez."""
+    for i, t in enumerate(tareas):
         clase = "completada" if t.completada else "pendiente"
         estado = "Completada" if t.completada else "Pendiente"
-        filas.append(f"""
+        if i:
+            yield "\n"
+        yield (f"""
             <div class="tarea {clase} prioridad-{t.prioridad}">
                 <div class="header-tarea">
                     <h3 class="titulo">{t.titulo}</h3>
@@ -96,8 +458,215 @@ def _generar_filas_html(tareas):
                 <span class="estado-final">{estado}</span>
             </div>
         """)
-    return "\n".join(filas)
+
+def generar_html_virtual(tam_chunk=TAM_CHUNK, directorio=DIR_DATOS, ventana=None,
+                         limite=LIMITE_MEMORIA):
+    """Genera index.html en modo virtual y los bloques JSON en `directorio`.
+
+    Cada sección (pendientes, completadas) se parte en bloques de `tam_chunk`
+    filas compactas ``[id, titulo, prioridad, fecha, etiquetas, descripcion]``.
+    Los bloques se escriben como scripts JSONP (``agendaChunk(...)``) porque
+    los navegadores no permiten ``fetch`` de archivos locales con ``file://``.
+
+    Args:
+        tam_chunk (int): Número de tareas por bloque.
+        directorio (str): Directorio donde se escriben los bloques.
+        ventana (tuple, opcional): (desde, hasta), igual que en generar_html.
+        limite (int, opcional): Tareas que se ordenan en memoria.
+
+    Returns:
+        tuple: (archivos reescritos, archivos generados). Los bloques cuyo
+        contenido no cambió no se reescriben.
+    """
+    if tam_chunk < 1:
+        raise ValueError("El tamaño de bloque debe ser un entero positivo.")
+    os.makedirs(directorio, exist_ok=True)
+    escritos = 0
+    generados = set()
+
+    secciones = []
+    with _clasificado(_flujo(ventana), limite) as (pendientes, completadas):
+        total = len(pendientes) + len(completadas)
+        for nombre, orden in (("pendientes", pendientes), ("completadas", completadas)):
+            flujo = iter(orden)
+            n = 0
+            while True:
+                filas = [_fila_compacta(t) for t in islice(flujo, tam_chunk)]
+                if not filas:
+                    break
+                ruta = os.path.join(directorio, f"{nombre}-{n}.js")
+                escritos += _escribir_atomico(
+                    ruta, f"agendaChunk({json.dumps(nombre)},{n},{_json_compacto(filas)});\n")
+                generados.add(ruta)
+                n += 1
+            secciones.append({"nombre": nombre, "total": len(orden)})
+
+    # Eliminar bloques sobrantes de exportaciones anteriores
+    for archivo in os.listdir(directorio):
+        viejo = os.path.join(directorio, archivo)
+        if _PATRON_CHUNK.match(archivo) and viejo not in generados:
+            os.remove(viejo)
+
+    manifiesto = {
+        "directorio": directorio.replace(os.sep, "/"),
+        "tam_chunk": tam_chunk,
+        "secciones": secciones,
+    }
+    escritos += _escribir_atomico(os.path.join(directorio, "manifiesto.js"),
+                                  f"agendaManifiesto({_json_compacto(manifiesto)});\n")
+    escritos += _escribir_atomico(
+        "index.html", VIRTUAL_TEMPLATE.replace("datos/manifiesto.js",
+                                               f"{manifiesto['directorio']}/manifiesto.js"))
+
+    print(f"Archivo 'index.html' (modo virtual) generado correctamente "
+          f"con {total} tareas en '{directorio}/'.")
+    return escritos, len(generados) + 2
+
+def _cargar(ventana, archivo=DATA_FILE):
+    """Carga las tareas, expandiendo las recurrentes si hay ventana."""
+    try:
+        tareas = cargar_tareas(archivo)
+    except FileNotFoundError:
+        tareas = []
+    if ventana:
+        tareas = list(expandir(tareas, *ventana))
+    return tareas
+
+def _flujo(ventana, archivo=DATA_FILE):
+    """Lee las tareas en flujo, expandiendo las recurrentes si hay ventana."""
+    tareas = iterar_tareas(archivo)
+    if ventana:
+        tareas = expandir(tareas, *ventana)
+    return tareas
+
+def _encadenar(*partes):
+    """Encadena varias secuencias de fragmentos de texto."""
+    for parte in partes:
+        yield from parte
+
+def _fila_compacta(t):
+    """Representa una tarea como lista compacta para los bloques JSON."""
+    return [t.id, t.titulo, t.prioridad, t.fecha, list(t.etiquetas), t.descripcion]
+
+def _json_compacto(datos):
+    """Serializa a JSON sin espacios superfluos."""
+    return json.dumps(datos, ensure_ascii=False, separators=(",", ":"))
+
+def _escribir_atomico(ruta, contenido):
+    """Escribe `contenido` en `ruta` sólo si cambió, de forma atómica.
+
+    El texto se escribe en un archivo temporal del mismo directorio y luego
+    se renombra sobre el destino, así quien lea la página nunca ve un
+    archivo a medio escribir.
+
+    Args:
+        ruta (str): Archivo destino.
+        contenido (str | iterable[str]): Texto completo o fragmentos
+            consecutivos (para no armar en memoria páginas grandes).
+
+    Returns:
+        bool: True si el archivo se reescribió, False si ya era idéntico.
+    """
+    if isinstance(contenido, str):
+        contenido = [contenido]
+    directorio = os.path.dirname(ruta) or "."
+    try:
+        modo = os.stat(ruta).st_mode & 0o777
+    except FileNotFoundError:
+        modo = 0o644
+    fd, temporal = tempfile.mkstemp(dir=directorio, prefix=".export-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(contenido)
+        if os.path.exists(ruta) and filecmp.cmp(temporal, ruta, shallow=False):
+            os.unlink(temporal)
+            return False
+        os.chmod(temporal, modo)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+    return True
+
+def vigilar(regenerar, archivo=DATA_FILE):
+    """Regenera la exportación cada vez que cambian los datos de la agenda.
+
+    Se vigila el archivo de datos y cualquier archivo hermano cuyo nombre
+    empiece igual (bitácoras o fragmentos, p. ej. '.tareas.json.journal').
+    Las ráfagas de cambios se agrupan en una sola regeneración.
+
+    Args:
+        regenerar (callable): Función sin argumentos que genera la
+            exportación y devuelve (archivos reescritos, archivos generados).
+        archivo (str): Archivo de datos a vigilar.
+    """
+    vigilante = Vigilante(archivo)
+    print(f"Vigilando '{archivo}' ({vigilante.modo}). Ctrl+C para terminar.")
+    try:
+        try:
+            regenerar()
+        except (ValueError, KeyError) as exc:
+            # Igual que dentro del ciclo: se espera el siguiente cambio
+            print(f"Error al regenerar: {exc}")
+        while True:
+            primer_cambio = vigilante.esperar_rafaga()
+            inicio = time.perf_counter()
+            try:
+                escritos, total = regenerar()
+            except (ValueError, KeyError) as exc:
+                # Normalmente el archivo de datos estaba a medio escribir;
+                # el siguiente evento volverá a disparar la regeneración.
+                print(f"Error al regenerar: {exc}")
+                continue
+            fin = time.perf_counter()
+            print(f"Regenerado en {(fin - inicio) * 1000:.1f} ms "
+                  f"({(fin - primer_cambio) * 1000:.1f} ms desde el primer cambio); "
+                  f"{escritos} de {total} archivos actualizados.")
+    except KeyboardInterrupt:
+        print("Vigilancia terminada.")
+    finally:
+        vigilante.cerrar()
+
+def main():
+    parser = argparse.ArgumentParser(prog="export_html",
+                                     description="Exportar la agenda a HTML")
+    parser.add_argument("--virtual", action="store_true",
+                        help="Generar la página con desplazamiento virtual y datos por bloques")
+    parser.add_argument("--tam-chunk", type=entero_positivo, default=TAM_CHUNK,
+                        help=f"Tareas por bloque en modo virtual (por defecto {TAM_CHUNK})")
+    parser.add_argument("--watch", action="store_true",
+                        help="Regenerar la exportación cada vez que cambien los datos")
+    parser.add_argument("--desde", type=fecha_arg,
+                        help="Exportar desde esta fecha (expande recurrentes)")
+    parser.add_argument("--hasta", type=fecha_arg,
+                        help="Exportar hasta esta fecha (expande recurrentes)")
+    parser.add_argument("--espacio", action="store_true",
+                        help="Exportar todas las agendas registradas en una sola página")
+    parser.add_argument("--procesos", action="store_true",
+                        help="Con --espacio, usar procesos en lugar de hilos")
+    parser.add_argument("--memoria", type=entero_positivo,
+                        help="Tareas a ordenar en memoria antes de usar archivos "
+                             f"temporales (por defecto {LIMITE_MEMORIA})")
+    args = parser.parse_args()
+    if args.espacio and (args.virtual or args.watch or args.memoria):
+        parser.error("--espacio no se puede combinar con --virtual, --watch ni --memoria")
+    limite = args.memoria or LIMITE_MEMORIA
+
+    ventana = ventana_de_args(args)
+
+    if args.espacio:
+        regenerar = lambda: generar_html_espacio(ventana, args.procesos)
+    elif args.virtual:
+        regenerar = lambda: generar_html_virtual(args.tam_chunk, ventana=ventana,
+                                                 limite=limite)
+    else:
+        regenerar = lambda: generar_html(ventana, limite)
+
+    if args.watch:
+        vigilar(regenerar)
+    else:
+        regenerar()
 
 
 if __name__ == "__main__":
-    generar_html()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+Módulo flujo.py
+
+Lectura incremental del archivo de datos de la agenda.
+
+En lugar de cargar todo el JSON con json.load, el archivo se lee por bloques
+y cada tarea se decodifica y se entrega en cuanto está completa, así la
+memoria usada no depende del tamaño de la agenda. Acepta el formato con
+vocabulario de etiquetas (ver etiquetas.py) y el formato anterior (lista).
+"""
+
+import json
+import os
+import re
+
+from etiquetas import Vocabulario, internar
+
+# Caracteres leídos del archivo en cada bloque
+TAM_BLOQUE = 1 << 16
+
+_DECODIFICADOR = json.JSONDecoder()
+_ESPACIOS = re.compile(r"\s*")
+
+
+class _Lector:
+    """Analizador JSON mínimo que avanza por bloques sobre un archivo."""
+
+    def __init__(self, archivo):
+        self._archivo = archivo
+        self._texto = ""
+        self._pos = 0
+        self._agotado = False
+
+    def _leer_mas(self, tam=None):
+        """Agrega un bloque al búfer; False si ya no hay más texto."""
+        bloque = self._archivo.read(tam or TAM_BLOQUE)
+        if not bloque:
+            self._agotado = True
+            return False
+        # Descartar lo ya consumido antes de crecer el búfer
+        self._texto = self._texto[self._pos:] + bloque
+        self._pos = 0
+        return True
+
+    def caracter(self):
+        """Siguiente carácter significativo (sin consumirlo); '' al final."""
+        while True:
+            self._pos = _ESPACIOS.match(self._texto, self._pos).end()
+            if self._pos < len(self._texto) or not self._leer_mas():
+                break
+        return self._texto[self._pos:self._pos + 1]
+
+    def consumir(self, esperado):
+        """Consume el carácter `esperado`.
+
+        Raises:
+            ValueError: Si el siguiente carácter es otro.
+        """
+        encontrado = self.caracter()
+        if encontrado != esperado:
+            raise ValueError(f"JSON inválido: se esperaba {esperado!r} "
+                             f"y se encontró {encontrado!r}.")
+        self._pos += 1
+
+    def valor(self):
+        """Decodifica el siguiente valor JSON completo, leyendo lo necesario."""
+        self.caracter()
+        tam = TAM_BLOQUE
+        while True:
+            try:
+                valor, fin = _DECODIFICADOR.raw_decode(self._texto, self._pos)
+            except json.JSONDecodeError:
+                if not self._leer_mas(tam):
+                    raise
+                tam *= 2
+                continue
+            # Un número al final del búfer podría seguir en el próximo bloque
+            if fin == len(self._texto) and not self._agotado and self._leer_mas(tam):
+                continue
+            self._pos = fin
+            return valor
+
+    def elementos(self):
+        """Genera uno a uno los elementos del arreglo JSON que sigue."""
+        self.consumir("[")
+        if self.caracter() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.valor()
+            if self.caracter() == ",":
+                self._pos += 1
+                continue
+            self.consumir("]")
+            return
+
+
+def iterar_documento(archivo):
+    """
+    Genera las tareas (diccionarios) del archivo de datos sin cargarlo entero.
+
+    Las etiquetas se entregan como tuplas internadas, igual que
+    etiquetas.decodificar.
+
+    Args:
+        archivo (str): Ruta del archivo de datos.
+
+    Yields:
+        dict: Una tarea por elemento del archivo.
+
+    Raises:
+        ValueError: Si el archivo no es JSON válido.
+    """
+    if not os.path.exists(archivo):
+        return
+    with open(archivo, "r", encoding="utf-8") as f:
+        lector = _Lector(f)
+        if lector.caracter() == "[":
+            for d in lector.elementos():
+                yield {**d, "etiquetas": internar(d.get("etiquetas"))}
+            return
+
+        vocabulario = None
+        sin_vocabulario = []
+        lector.consumir("{")
+        while lector.caracter() != "}":
+            clave = lector.valor()
+            lector.consumir(":")
+            if clave == "tareas" and vocabulario is not None:
+                for d in lector.elementos():
+                    yield {**d, "etiquetas": vocabulario.tupla(d.get("etiquetas", ()))}
+            elif clave == "tareas":
+                # El vocabulario viene después (archivo editado a mano):
+                # no queda más que guardar las tareas hasta leerlo.
+                sin_vocabulario = lector.valor()
+            else:
+                valor = lector.valor()
+                if clave == "etiquetas":
+                    vocabulario = Vocabulario(valor)
+            if lector.caracter() == ",":
+                lector.consumir(",")
+        lector.consumir("}")
+
+        if sin_vocabulario:
+            vocabulario = vocabulario or Vocabulario()
+            for d in sin_vocabulario:
+                yield {**d, "etiquetas": vocabulario.tupla(d.get("etiquetas", ()))}
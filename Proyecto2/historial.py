@@ -0,0 +1,461 @@
+"""
+Módulo historial.py
+
+Historial de cambios de la agenda basado en deltas.
+
+Cada modificación del archivo de datos se guarda como un delta compacto (sólo
+las tareas que cambiaron) en ``<archivo>.historial/deltas.jsonl``. Cada
+``CADA_CHECKPOINT`` revisiones se guarda además una copia completa comprimida
+(checkpoint). Cualquier estado pasado se reconstruye desde el checkpoint más
+cercano aplicando a lo más ``CADA_CHECKPOINT`` deltas.
+
+Formato de un delta::
+
+    {"rev": 7, "fecha": "2025-10-19T10:51:02", "motivo": "rm T-0003",
+     "+": {id: tarea},          # tareas nuevas o reemplazadas completas
+     "~": {id: {campo: valor}}, # campos modificados
+     "-": [id, ...],            # tareas eliminadas
+     "pos": {id: indice},       # posición de tareas nuevas (si no van al final)
+     "orden": [id, ...],        # orden completo (sólo si se reacomodó)
+     "renombres": [[viejo, nuevo], ...],  # etiquetas renombradas o fusionadas
+     "estado": [tarea, ...],    # estado completo (cambios hechos por fuera)
+     "restaura": 5,             # presente en las entradas de 'deshacer'
+     "huella": "9f2c..."}       # resumen del estado resultante
+
+Si el archivo de datos se modificó sin pasar por el historial (a mano, con
+'save' sobre él, ...), antes del siguiente cambio se registra su estado
+completo como una revisión "cambio externo", para que la cadena de deltas
+siga correspondiendo al archivo.
+
+La retención se configura con las variables de entorno
+AGENDA_HISTORIAL_RETENCION (revisiones que siempre se pueden reconstruir) y
+AGENDA_HISTORIAL_CHECKPOINT (revisiones entre checkpoints).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+from parametros import entero_de_entorno
+
+# Revisiones entre checkpoints completos
+CADA_CHECKPOINT = entero_de_entorno("AGENDA_HISTORIAL_CHECKPOINT", 50)
+# Número mínimo de revisiones recientes que se conservan
+RETENCION = entero_de_entorno("AGENDA_HISTORIAL_RETENCION", 200)
+
+_DELTAS = "deltas.jsonl"
+_PATRON_CHECKPOINT = re.compile(r"^checkpoint-(\d+)\.json\.gz$")
+
+
+def directorio_historial(archivo):
+    """Devuelve el directorio donde se guarda el historial de `archivo`."""
+    return archivo + ".historial"
+
+
+def registrar(archivo, antes, despues, motivo, restaura=None):
+    """
+    Registra un cambio del archivo de datos.
+
+    Args:
+        archivo (str): Archivo de datos de la agenda.
+        antes (list[dict]): Tareas antes del cambio.
+        despues (list[dict]): Tareas después del cambio.
+        motivo (str): Descripción breve (normalmente el comando).
+        restaura (int, opcional): Revisión restaurada por 'deshacer'.
+
+    Returns:
+        int | None: Número de la nueva revisión, o None si no hubo cambios.
+    """
+    delta = calcular_delta(antes, despues)
+    if not delta and restaura is None:
+        return None
+    preparar(archivo, antes)
+    if restaura is not None:
+        delta["restaura"] = restaura
+    return registrar_delta(archivo, delta, motivo, despues)
+
+
+def iniciar(archivo, tareas):
+    """
+    Crea el historial con `tareas` como revisión base r0.
+
+    Args:
+        archivo (str): Archivo de datos de la agenda.
+        tareas (list[dict]): Estado actual, antes del primer cambio.
+    """
+    directorio = directorio_historial(archivo)
+    os.makedirs(directorio, exist_ok=True)
+    _escribir_checkpoint(directorio, 0, tareas)
+
+
+def preparar(archivo, antes):
+    """
+    Deja el historial listo para registrar un cambio hecho sobre `antes`.
+
+    Si no hay historial, lo inicia con `antes` como base. Si lo hay pero
+    `antes` no coincide con la última revisión, registra primero `antes`
+    completo como "cambio externo".
+
+    Args:
+        archivo (str): Archivo de datos de la agenda.
+        antes (list[dict]): Contenido actual del archivo de datos.
+    """
+    if posicion_actual(archivo) is None:
+        # Primer cambio registrado: el estado previo es la base
+        iniciar(archivo, antes)
+    elif huella(antes) != _huella_ultima(archivo):
+        registrar_delta(archivo, {"estado": antes}, "cambio externo", antes)
+
+
+def huella(tareas):
+    """Resumen corto de un estado, para comparar sin guardar copias."""
+    texto = json.dumps(tareas, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def registrar_delta(archivo, delta, motivo, despues=None):
+    """
+    Agrega un delta ya calculado al historial (que debe estar iniciado).
+
+    Args:
+        archivo (str): Archivo de datos de la agenda.
+        delta (dict): Delta a registrar.
+        motivo (str): Descripción breve del cambio.
+        despues (list[dict], opcional): Estado resultante; si se omite, se
+            reconstruye a partir del historial.
+
+    Returns:
+        int: Número de la nueva revisión.
+    """
+    directorio = directorio_historial(archivo)
+    ultima = _ultima_entrada(directorio)
+    rev = (ultima["rev"] if ultima else _checkpoints(directorio)[-1]) + 1
+    if despues is None:
+        despues = aplicar_delta(reconstruir(archivo, rev - 1), delta)
+
+    entrada = {"rev": rev, "fecha": datetime.now().isoformat(timespec="seconds"),
+               "motivo": motivo}
+    entrada.update(delta)
+    entrada["huella"] = huella(despues)
+    with open(os.path.join(directorio, _DELTAS), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entrada, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    if rev % CADA_CHECKPOINT == 0:
+        _escribir_checkpoint(directorio, rev, despues)
+    _podar(directorio, rev)
+    return rev
+
+
+def calcular_delta(antes, despues):
+    """
+    Calcula el delta que transforma la lista `antes` en `despues`.
+
+    Args:
+        antes (list[dict]): Tareas originales.
+        despues (list[dict]): Tareas resultantes.
+
+    Returns:
+        dict: Delta (vacío si ambas listas son iguales).
+    """
+    ids_antes = [t["id"] for t in antes]
+    ids_despues = [t["id"] for t in despues]
+    if len(set(ids_antes)) != len(ids_antes) or len(set(ids_despues)) != len(ids_despues):
+        # Con ids repetidos no se puede indexar: se guarda el estado completo
+        return {} if antes == despues else {"estado": despues}
+
+    previas = dict(zip(ids_antes, antes))
+    nuevas = dict(zip(ids_despues, despues))
+    delta = {}
+
+    completas, parciales = {}, {}
+    for id_, tarea in nuevas.items():
+        vieja = previas.get(id_)
+        if vieja is None or set(vieja) - set(tarea):
+            if vieja != tarea:
+                completas[id_] = tarea
+        elif vieja != tarea:
+            parciales[id_] = {k: v for k, v in tarea.items() if vieja.get(k) != v}
+    eliminadas = [id_ for id_ in ids_antes if id_ not in nuevas]
+    if completas:
+        delta["+"] = completas
+    if parciales:
+        delta["~"] = parciales
+    if eliminadas:
+        delta["-"] = eliminadas
+
+    # Orden: sobrevivientes en su orden previo y las nuevas en su posición
+    sobrevivientes = [id_ for id_ in ids_antes if id_ in nuevas]
+    if [id_ for id_ in ids_despues if id_ in previas] != sobrevivientes:
+        delta["orden"] = ids_despues
+    else:
+        agregadas = [id_ for id_ in ids_despues if id_ not in previas]
+        if ids_despues[len(sobrevivientes):] != agregadas:
+            delta["pos"] = {id_: i for i, id_ in enumerate(ids_despues)
+                            if id_ not in previas}
+    return delta
+
+
+def aplicar_delta(tareas, delta):
+    """
+    Aplica un delta a una lista de tareas.
+
+    Args:
+        tareas (list[dict]): Estado de partida (no se modifica).
+        delta (dict): Delta producido por calcular_delta.
+
+    Returns:
+        list[dict]: Estado resultante.
+    """
+    if "estado" in delta:
+        return [dict(t) for t in delta["estado"]]
+
+    for viejo, nuevo in delta.get("renombres", []):
+        tareas = [{**t, "etiquetas": list(dict.fromkeys(
+            nuevo if e == viejo else e for e in t["etiquetas"]))}
+            if viejo in t["etiquetas"] else t for t in tareas]
+
+    por_id = {t["id"]: t for t in tareas}
+    orden = [t["id"] for t in tareas]
+    for id_ in delta.get("-", []):
+        del por_id[id_]
+    orden = [id_ for id_ in orden if id_ in por_id]
+    for id_, tarea in delta.get("+", {}).items():
+        if id_ not in por_id:
+            orden.append(id_)
+        por_id[id_] = dict(tarea)
+    for id_, campos in delta.get("~", {}).items():
+        por_id[id_] = {**por_id[id_], **campos}
+
+    if "orden" in delta:
+        orden = delta["orden"]
+    elif "pos" in delta:
+        nuevas = set(delta["pos"])
+        orden = [id_ for id_ in orden if id_ not in nuevas]
+        for id_, i in sorted(delta["pos"].items(), key=lambda par: par[1]):
+            orden.insert(i, id_)
+    return [por_id[id_] for id_ in orden]
+
+
+def revisiones(archivo):
+    """
+    Lista las entradas del historial, de la más antigua a la más reciente.
+
+    Returns:
+        list[dict]: Entradas de deltas registradas.
+    """
+    ruta = os.path.join(directorio_historial(archivo), _DELTAS)
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, "r", encoding="utf-8") as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def revision_mas_antigua(archivo):
+    """Devuelve la revisión más antigua que se puede reconstruir, o None."""
+    checkpoints = _checkpoints(directorio_historial(archivo))
+    return checkpoints[0] if checkpoints else None
+
+
+def posicion_actual(archivo):
+    """
+    Revisión a la que corresponde el estado actual, vista desde 'deshacer'.
+
+    Si la última entrada fue un 'deshacer', el estado actual es el de la
+    revisión que restauró; así, deshacer varias veces retrocede en cadena.
+
+    Returns:
+        int | None: Revisión, o None si no hay historial.
+    """
+    directorio = directorio_historial(archivo)
+    ultima = _ultima_entrada(directorio)
+    if ultima is None:
+        checkpoints = _checkpoints(directorio)
+        return checkpoints[-1] if checkpoints else None
+    return ultima.get("restaura", ultima["rev"])
+
+
+def reconstruir(archivo, rev):
+    """
+    Reconstruye las tareas tal como estaban en la revisión `rev`.
+
+    Args:
+        archivo (str): Archivo de datos de la agenda.
+        rev (int): Revisión a reconstruir.
+
+    Returns:
+        list[dict]: Tareas en esa revisión.
+
+    Raises:
+        ValueError: Si la revisión no existe, ya fue descartada o el
+            historial está dañado.
+    """
+    directorio = directorio_historial(archivo)
+    base = [c for c in _checkpoints(directorio) if c <= rev]
+    if not base:
+        raise ValueError(f"La revisión r{rev} ya no está en el historial.")
+    ultima = _ultima_entrada(directorio)
+    if rev > (ultima["rev"] if ultima else base[-1]):
+        raise ValueError(f"La revisión r{rev} no existe.")
+
+    entradas = []
+    if rev > base[-1]:
+        with open(os.path.join(directorio, _DELTAS), "r", encoding="utf-8") as f:
+            for linea in f:
+                entrada = json.loads(linea)
+                if entrada["rev"] > rev:
+                    break
+                if entrada["rev"] > base[-1]:
+                    entradas.append(entrada)
+    # Una entrada con el estado completo hace innecesario lo anterior
+    completas = [i for i, e in enumerate(entradas) if "estado" in e]
+    if completas:
+        entradas = entradas[completas[-1]:]
+        tareas = []
+    else:
+        tareas = _leer_checkpoint(directorio, base[-1])
+    for entrada in entradas:
+        try:
+            tareas = aplicar_delta(tareas, entrada)
+        except (KeyError, IndexError, TypeError) as exc:
+            raise ValueError(f"El historial está dañado en la revisión "
+                             f"r{entrada['rev']} ({exc!r}).") from exc
+    return tareas
+
+
+def resolver(archivo, referencia):
+    """
+    Convierte una referencia de revisión o fecha en un número de revisión.
+
+    Args:
+        archivo (str): Archivo de datos de la agenda.
+        referencia (str): 'r12', '12', 'AAAA-MM-DD' o 'AAAA-MM-DDTHH:MM[:SS]'.
+            Con una fecha se toma la última revisión registrada hasta ese
+            momento (para una fecha sin hora, hasta el final del día).
+
+    Returns:
+        int: Número de revisión.
+
+    Raises:
+        ValueError: Si la referencia no es válida o no hay historial.
+    """
+    referencia = referencia.strip()
+    coincidencia = re.fullmatch(r"[rR]?(\d+)", referencia)
+    if coincidencia:
+        return int(coincidencia.group(1))
+
+    try:
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", referencia):
+            limite = datetime.strptime(referencia, "%Y-%m-%d").replace(
+                hour=23, minute=59, second=59)
+        else:
+            limite = datetime.fromisoformat(referencia)
+    except ValueError as exc:
+        raise ValueError(f"Referencia inválida: {referencia}") from exc
+
+    base = revision_mas_antigua(archivo)
+    if base is None:
+        raise ValueError("No hay historial registrado.")
+    rev = None
+    for entrada in revisiones(archivo):
+        if datetime.fromisoformat(entrada["fecha"]) > limite:
+            break
+        rev = entrada["rev"]
+    if rev is None:
+        if base > 0:
+            raise ValueError(f"El historial conservado empieza después de {referencia}.")
+        return 0
+    return rev
+
+
+def _huella_ultima(archivo):
+    """Huella del estado de la última revisión (None si no se puede obtener)."""
+    directorio = directorio_historial(archivo)
+    ultima = _ultima_entrada(directorio)
+    if ultima is not None and "huella" in ultima:
+        return ultima["huella"]
+    # Entradas anteriores a las huellas: se reconstruye el estado
+    try:
+        return huella(reconstruir(archivo, ultima["rev"] if ultima
+                                  else _checkpoints(directorio)[-1]))
+    except ValueError:
+        return None
+
+
+def _ultima_entrada(directorio):
+    """Lee sólo la última línea de deltas.jsonl (None si no hay entradas)."""
+    ruta = os.path.join(directorio, _DELTAS)
+    try:
+        with open(ruta, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            fin = f.tell()
+            bloque = b""
+            pos = fin
+            while pos > 0:
+                paso = min(4096, pos)
+                pos -= paso
+                f.seek(pos)
+                bloque = f.read(paso) + bloque
+                if bloque.rstrip(b"\n").count(b"\n") >= 1:
+                    break
+    except FileNotFoundError:
+        return None
+    lineas = bloque.rstrip(b"\n").split(b"\n")
+    if not lineas[-1]:
+        return None
+    return json.loads(lineas[-1].decode("utf-8"))
+
+
+def _checkpoints(directorio):
+    """Revisiones con checkpoint disponibles, en orden ascendente."""
+    try:
+        nombres = os.listdir(directorio)
+    except FileNotFoundError:
+        return []
+    return sorted(int(m.group(1)) for m in map(_PATRON_CHECKPOINT.match, nombres) if m)
+
+
+def _ruta_checkpoint(directorio, rev):
+    """Ruta del checkpoint de la revisión `rev`."""
+    return os.path.join(directorio, f"checkpoint-{rev:06d}.json.gz")
+
+
+def _escribir_checkpoint(directorio, rev, tareas):
+    """Guarda una copia completa y comprimida del estado."""
+    ruta = _ruta_checkpoint(directorio, rev)
+    temporal = ruta + ".tmp"
+    with gzip.open(temporal, "wt", encoding="utf-8") as f:
+        json.dump(tareas, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporal, ruta)
+
+
+def _leer_checkpoint(directorio, rev):
+    """Carga el estado guardado en un checkpoint."""
+    with gzip.open(_ruta_checkpoint(directorio, rev), "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _podar(directorio, ultima):
+    """
+    Descarta lo que ya no hace falta para reconstruir las últimas RETENCION
+    revisiones: los checkpoints anteriores al que cubre esa ventana y los
+    deltas previos a él.
+    """
+    checkpoints = _checkpoints(directorio)
+    necesarios = [c for c in checkpoints if c <= ultima - RETENCION]
+    if len(necesarios) < 2:
+        return
+    corte = necesarios[-1]
+
+    ruta = os.path.join(directorio, _DELTAS)
+    temporal = ruta + ".tmp"
+    with open(ruta, "r", encoding="utf-8") as origen, \
+            open(temporal, "w", encoding="utf-8") as destino:
+        for linea in origen:
+            if json.loads(linea)["rev"] > corte:
+                destino.write(linea)
+    os.replace(temporal, ruta)
+    for rev in necesarios[:-1]:
+        os.remove(_ruta_checkpoint(directorio, rev))
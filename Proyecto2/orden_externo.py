@@ -0,0 +1,142 @@
+"""
+Módulo orden_externo.py
+
+Ordenamiento externo (merge sort) para agendas que no caben en memoria.
+
+Mientras el número de elementos no pasa del límite, se ordena en memoria
+como siempre. Al pasarlo, cada bloque de `limite` elementos se ordena y se
+escribe en un archivo temporal (una "corrida"); al final las corridas se
+combinan con una mezcla de k vías que entrega los elementos uno a uno.
+
+El resultado es estable, igual que sorted(): dentro de cada corrida lo
+garantiza sorted() y entre corridas heapq.merge resuelve los empates a favor
+de la corrida anterior, que contiene los elementos que llegaron antes.
+"""
+
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+
+from parametros import entero_de_entorno
+
+# Elementos que se mantienen en memoria antes de pasar a disco
+LIMITE_MEMORIA = entero_de_entorno("AGENDA_LIMITE_ORDEN", 50000)
+# Máximo de corridas que se combinan a la vez (archivos abiertos)
+ABANICO = 64
+
+
+class OrdenadorExterno:
+    """
+    Acumula elementos y los entrega ordenados, usando disco si hace falta.
+
+    Se usa como administrador de contexto para borrar los temporales::
+
+        with OrdenadorExterno(clave=lambda t: t.fecha) as orden:
+            orden.extender(tareas)
+            for t in orden:
+                ...
+
+    Atributos:
+        clave (callable | None): Función de ordenamiento, como en sorted().
+        limite (int): Elementos que se mantienen en memoria.
+    """
+
+    def __init__(self, clave=None, limite=LIMITE_MEMORIA):
+        """
+        Inicializa el ordenador.
+
+        Args:
+            clave (callable, opcional): Función de ordenamiento.
+            limite (int, opcional): Elementos máximos en memoria.
+
+        Raises:
+            ValueError: Si el límite no es un entero positivo.
+        """
+        if not isinstance(limite, int) or limite < 1:
+            raise ValueError("El límite de memoria debe ser un entero positivo.")
+        self.clave = clave
+        self.limite = limite
+        self._bloque = []
+        self._corridas = []
+        self._total = 0
+        self._directorio = None
+
+    def agregar(self, elemento):
+        """Agrega un elemento; vuelca una corrida a disco al llegar al límite."""
+        self._bloque.append(elemento)
+        self._total += 1
+        if len(self._bloque) >= self.limite:
+            self._volcar()
+
+    def extender(self, elementos):
+        """Agrega todos los elementos de un iterable."""
+        for elemento in elementos:
+            self.agregar(elemento)
+
+    def __len__(self):
+        return self._total
+
+    @property
+    def en_disco(self):
+        """Indica si ya se escribieron corridas en archivos temporales."""
+        return bool(self._corridas)
+
+    def __iter__(self):
+        """Genera los elementos en orden (se puede recorrer varias veces)."""
+        if not self._corridas:
+            self._bloque.sort(key=self.clave)
+            return iter(self._bloque)
+        if self._bloque:
+            self._volcar()
+        # Con demasiadas corridas se combinan por grupos, en orden
+        while len(self._corridas) > ABANICO:
+            grupo, self._corridas = self._corridas[:ABANICO], self._corridas[ABANICO:]
+            self._corridas.insert(0, self._escribir_corrida(
+                heapq.merge(*map(self._leer_corrida, grupo), key=self.clave)))
+            for ruta in grupo:
+                os.remove(ruta)
+        return heapq.merge(*map(self._leer_corrida, self._corridas), key=self.clave)
+
+    def _volcar(self):
+        """Ordena el bloque en memoria y lo escribe como una corrida."""
+        self._bloque.sort(key=self.clave)
+        self._corridas.append(self._escribir_corrida(self._bloque))
+        self._bloque = []
+
+    def _escribir_corrida(self, elementos):
+        """Escribe elementos ya ordenados en un temporal y devuelve su ruta."""
+        if self._directorio is None:
+            self._directorio = tempfile.mkdtemp(prefix="agenda-orden-")
+        fd, ruta = tempfile.mkstemp(dir=self._directorio, suffix=".corrida")
+        with os.fdopen(fd, "wb") as f:
+            # Un pickle independiente por elemento: un Pickler/Unpickler
+            # compartido recordaría (y retendría) cada objeto procesado
+            for elemento in elementos:
+                pickle.dump(elemento, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return ruta
+
+    @staticmethod
+    def _leer_corrida(ruta):
+        """Genera los elementos de una corrida, uno a uno."""
+        with open(ruta, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+    def cerrar(self):
+        """Borra los archivos temporales y libera el bloque en memoria."""
+        self._bloque = []
+        self._corridas = []
+        if self._directorio is not None:
+            shutil.rmtree(self._directorio, ignore_errors=True)
+            self._directorio = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
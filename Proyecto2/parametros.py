@@ -0,0 +1,54 @@
+"""
+Módulo parametros.py
+
+Lectura de parámetros numéricos, tanto de la línea de comandos como de
+variables de entorno (límites de memoria, retención del historial, ...).
+"""
+
+import os
+import sys
+
+
+def entero_positivo(texto):
+    """
+    Convierte un texto en un entero mayor o igual a 1.
+
+    Args:
+        texto (str): Valor a convertir.
+
+    Returns:
+        int: El entero leído.
+
+    Raises:
+        ValueError: Si el texto no es un entero positivo.
+    """
+    try:
+        valor = int(texto)
+    except (TypeError, ValueError):
+        valor = 0
+    if valor < 1:
+        raise ValueError(f"Se esperaba un entero positivo: {texto}")
+    return valor
+
+
+def entero_de_entorno(variable, defecto):
+    """
+    Lee una variable de entorno que debe ser un entero positivo.
+
+    Args:
+        variable (str): Nombre de la variable.
+        defecto (int): Valor a usar si no está definida o no es válida.
+
+    Returns:
+        int: El valor de la variable, o `defecto` (con un aviso) si no es
+            un entero mayor o igual a 1.
+    """
+    texto = os.environ.get(variable)
+    if texto is None:
+        return defecto
+    try:
+        return entero_positivo(texto)
+    except ValueError:
+        print(f"Aviso: {variable}={texto!r} no es un entero positivo; "
+              f"se usa {defecto}.", file=sys.stderr)
+        return defecto
@@ -0,0 +1,157 @@
+"""
+Módulo recurrencia.py
+
+Define la clase Recurrencia, la regla de repetición de una tarea.
+
+Las ocurrencias nunca se guardan: se generan bajo demanda, sólo dentro de la
+ventana de fechas que se pide. De cada ocurrencia únicamente se guarda la
+excepción cuando se marca como hecha.
+"""
+
+import calendar
+from datetime import date, timedelta
+
+FRECUENCIAS = ("diaria", "semanal", "mensual")
+
+_UNIDADES = {"diaria": ("día", "días"), "semanal": ("semana", "semanas"),
+             "mensual": ("mes", "meses")}
+
+
+class Recurrencia:
+    """
+    Regla de repetición de una tarea a partir de su fecha inicial.
+
+    Atributos:
+        frecuencia (str): "diaria", "semanal" o "mensual".
+        intervalo (int): Cada cuántas unidades se repite (ej. 2 = cada 2 semanas).
+        hasta (str | None): Última fecha posible 'AAAA-MM-DD', o None.
+        veces (int | None): Número total de ocurrencias, o None.
+        hechas (set[str]): Fechas de las ocurrencias marcadas como hechas.
+    """
+
+    def __init__(self, frecuencia, intervalo=1, hasta=None, veces=None, hechas=None):
+        """
+        Inicializa la regla validando sus campos.
+
+        Raises:
+            ValueError: Si algún campo no cumple las validaciones.
+        """
+        if frecuencia not in FRECUENCIAS:
+            raise ValueError(f"Frecuencia inválida: {frecuencia}.")
+        if not isinstance(intervalo, int) or intervalo < 1:
+            raise ValueError("El intervalo debe ser un entero positivo.")
+        if veces is not None and (not isinstance(veces, int) or veces < 1):
+            raise ValueError("El número de repeticiones debe ser un entero positivo.")
+        if hasta is not None:
+            date.fromisoformat(hasta)
+        self.frecuencia = frecuencia
+        self.intervalo = intervalo
+        self.hasta = hasta
+        self.veces = veces
+        self.hechas = set(hechas) if hechas else set()
+
+    def __str__(self):
+        singular, plural = _UNIDADES[self.frecuencia]
+        if self.intervalo == 1:
+            return f"cada {singular}"
+        return f"cada {self.intervalo} {plural}"
+
+    def fecha_n(self, inicio, n):
+        """
+        Calcula la fecha de la n-ésima ocurrencia (n = 0 es la inicial).
+
+        Args:
+            inicio (date): Fecha de la primera ocurrencia.
+            n (int): Índice de la ocurrencia.
+
+        Returns:
+            date: Fecha de la ocurrencia.
+        """
+        if self.frecuencia == "diaria":
+            return inicio + timedelta(days=n * self.intervalo)
+        if self.frecuencia == "semanal":
+            return inicio + timedelta(weeks=n * self.intervalo)
+        # Mensual: mismo día del mes, o el último si el mes es más corto
+        meses = inicio.month - 1 + n * self.intervalo
+        anio, mes = inicio.year + meses // 12, meses % 12 + 1
+        return date(anio, mes, min(inicio.day, calendar.monthrange(anio, mes)[1]))
+
+    def _primer_indice(self, inicio, desde):
+        """Índice de la primera ocurrencia que no es anterior a `desde`."""
+        if desde <= inicio:
+            return 0
+        if self.frecuencia == "mensual":
+            meses = (desde.year - inicio.year) * 12 + desde.month - inicio.month
+            n = max(0, meses // self.intervalo - 1)
+        else:
+            paso = self.intervalo * (7 if self.frecuencia == "semanal" else 1)
+            n = (desde - inicio).days // paso
+        while self.fecha_n(inicio, n) < desde:
+            n += 1
+        return n
+
+    def ocurrencias(self, inicio, desde=None, hasta=None):
+        """
+        Genera las fechas de las ocurrencias dentro de la ventana dada.
+
+        El cálculo salta directamente a la primera ocurrencia de la ventana,
+        por lo que el costo depende sólo del número de fechas generadas.
+
+        Args:
+            inicio (date): Fecha de la primera ocurrencia.
+            desde (date, opcional): Inicio de la ventana (inclusive).
+            hasta (date, opcional): Fin de la ventana (inclusive). Sin él,
+                la regla debe tener fin propio o el generador es infinito.
+
+        Yields:
+            date: Fechas de las ocurrencias, en orden.
+        """
+        limite = date.fromisoformat(self.hasta) if self.hasta else None
+        if hasta is not None:
+            limite = hasta if limite is None else min(limite, hasta)
+        n = self._primer_indice(inicio, desde) if desde is not None else 0
+        while self.veces is None or n < self.veces:
+            fecha = self.fecha_n(inicio, n)
+            if limite is not None and fecha > limite:
+                return
+            yield fecha
+            n += 1
+
+    def es_ocurrencia(self, inicio, fecha):
+        """Indica si `fecha` (date) corresponde a una ocurrencia de la regla."""
+        return next(self.ocurrencias(inicio, fecha, fecha), None) is not None
+
+    def to_dict(self):
+        """
+        Convierte la regla a un diccionario serializable en JSON.
+
+        Returns:
+            dict: Representación de la regla (sólo campos con valor).
+        """
+        datos = {"frecuencia": self.frecuencia, "intervalo": self.intervalo}
+        if self.hasta is not None:
+            datos["hasta"] = self.hasta
+        if self.veces is not None:
+            datos["veces"] = self.veces
+        if self.hechas:
+            datos["hechas"] = sorted(self.hechas)
+        return datos
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Crea una regla a partir de un diccionario (ej. cargado desde JSON).
+
+        Args:
+            data (dict): Diccionario con los campos de la regla.
+
+        Returns:
+            Recurrencia: Nueva instancia de la clase.
+        """
+        return cls(
+            frecuencia=data["frecuencia"],
+            intervalo=data.get("intervalo", 1),
+            hasta=data.get("hasta"),
+            veces=data.get("veces"),
+            hechas=data.get("hechas"),
+        )
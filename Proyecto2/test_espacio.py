@@ -0,0 +1,128 @@
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import agenda
+import espacio
+from Tarea import Tarea
+
+
+def _ejecutar(*argumentos):
+    """Ejecuta el CLI de la agenda y devuelve lo que imprimió."""
+    salida = io.StringIO()
+    with mock.patch.object(sys, "argv", ["agenda", *argumentos]), \
+            contextlib.redirect_stdout(salida):
+        agenda.main()
+    return salida.getvalue()
+
+
+def _clave(par):
+    return par[0]
+
+
+class TestFusionar(unittest.TestCase):
+    """Pruebas de la mezcla de k vías."""
+
+    def test_estable_igual_que_sorted(self):
+        """Mezclar flujos ordenados debería dar lo mismo que ordenar la concatenación."""
+        azar = random.Random(8)
+        for _ in range(50):
+            flujos = [sorted(((azar.randint(0, 5), (k, i)) for i in range(azar.randrange(30))),
+                             key=_clave)
+                      for k in range(azar.randint(1, 6))]
+            concatenados = [par for flujo in flujos for par in flujo]
+            self.assertEqual(list(espacio.fusionar(flujos, _clave)),
+                             sorted(concatenados, key=_clave))
+
+    def test_sin_flujos(self):
+        """Sin agendas no debería haber resultados."""
+        self.assertEqual(list(espacio.fusionar([], _clave)), [])
+        self.assertEqual(espacio.consultar(agenda._consulta_ls, {}, None, None), [])
+
+
+class TestEspacio(unittest.TestCase):
+    """Pruebas del registro de agendas y de las consultas en paralelo."""
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        anterior = os.getcwd()
+        os.chdir(temporal.name)
+        self.addCleanup(os.chdir, anterior)
+
+        os.mkdir("equipos")
+        azar = random.Random(9)
+        for nombre in ("ventas", "soporte"):
+            tareas = [Tarea(f"T-{i:04d}", f"{nombre} {i}", azar.randint(1, 5),
+                            f"2026-0{azar.randint(1, 3)}-1{azar.randint(0, 9)}")
+                      for i in range(1, 16)]
+            agenda.guardar_tareas(tareas, os.path.join("equipos", f"{nombre}.json"))
+            _ejecutar("espacio", "add", nombre, os.path.join("equipos", f"{nombre}.json"))
+
+    def test_registro_con_rutas_relativas(self):
+        """El registro debería guardar rutas relativas y cargarlas absolutas."""
+        agendas = espacio.cargar_espacio()
+        self.assertEqual(list(agendas), ["ventas", "soporte"])
+        self.assertEqual(agendas["ventas"], os.path.abspath("equipos/ventas.json"))
+        with open(espacio.ESPACIO_FILE, encoding="utf-8") as f:
+            self.assertIn('"equipos/ventas.json"', f.read())
+        for invalido in ("mi equipo", "a:b", ""):
+            with self.assertRaises(ValueError):
+                espacio.validar_nombre(invalido)
+
+    def test_con_espacio(self):
+        """Los ids deberían llevar el nombre de la agenda como prefijo."""
+        tareas = espacio.con_espacio(agenda.cargar_tareas("equipos/ventas.json"), "ventas")
+        self.assertEqual([t.id for t in tareas][:2], ["ventas:T-0001", "ventas:T-0002"])
+
+    def test_resolver_id(self):
+        """Los ids con prefijo deberían apuntar al archivo de su agenda."""
+        self.assertEqual(agenda._resolver_id("T-0003"), (agenda.DATA_FILE, "T-0003"))
+        self.assertEqual(agenda._resolver_id("soporte:T-0003"),
+                         (os.path.abspath("equipos/soporte.json"), "T-0003"))
+        self.assertEqual(agenda._archivo_agenda(None), agenda.DATA_FILE)
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            self.assertIsNone(agenda._resolver_id("nada:T-0001"))
+            self.assertIsNone(agenda._archivo_agenda("nada"))
+        self.assertIn("Error: La agenda nada no está registrada", salida.getvalue())
+
+    def test_rm_en_agenda_del_espacio(self):
+        """'rm' con prefijo debería cambiar sólo esa agenda y poder deshacerse."""
+        original = agenda._leer_datos("equipos/ventas.json")
+        _ejecutar("rm", "ventas:T-0002")
+        self.assertEqual(len(agenda._leer_datos("equipos/ventas.json")), 14)
+        self.assertEqual(len(agenda._leer_datos("equipos/soporte.json")), 15)
+        self.assertIn("Error", _ejecutar("rm", "nada:T-0002"))
+        _ejecutar("deshacer", "--agenda", "ventas")
+        self.assertEqual(agenda._leer_datos("equipos/ventas.json"), original)
+
+    def test_consultar_con_hilos_y_procesos(self):
+        """Hilos y procesos deberían dar los mismos resultados, en orden de registro."""
+        agendas = espacio.cargar_espacio()
+        resultados = [
+            [[(t.id, t.fecha) for t in lista]
+             for lista in espacio.consultar(agenda._consulta_ls, agendas, None, "fecha",
+                                            procesos=procesos)]
+            for procesos in (False, True)
+        ]
+        self.assertEqual(resultados[0], resultados[1])
+        self.assertTrue(all(id_.startswith("ventas:") for id_, _ in resultados[0][0]))
+        self.assertTrue(all(id_.startswith("soporte:") for id_, _ in resultados[0][1]))
+
+    def test_ls_espacio_ordenado(self):
+        """'ls --espacio --por fecha' debería equivaler a ordenar todas las agendas juntas."""
+        todas = [t for nombre, ruta in espacio.cargar_espacio().items()
+                 for t in espacio.con_espacio(agenda.cargar_tareas(ruta), nombre)]
+        esperado = [t.id for t in sorted(todas, key=lambda t: t.fecha)]
+        salida = _ejecutar("ls", "--espacio", "--por", "fecha")
+        self.assertEqual([linea.split()[0] for linea in salida.splitlines()], esperado)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import agenda
+import historial
+
+
+def _ejecutar(*argumentos):
+    """Ejecuta el CLI de la agenda y devuelve lo que imprimió."""
+    salida = io.StringIO()
+    with mock.patch.object(sys, "argv", ["agenda", *argumentos]), \
+            contextlib.redirect_stdout(salida):
+        agenda.main()
+    return salida.getvalue()
+
+
+def _tarea(n, azar):
+    return {
+        "id": f"T-{n:04d}",
+        "titulo": f"Tarea {n}",
+        "prioridad": azar.randint(1, 5),
+        "fecha": f"2026-{azar.randint(1, 12):02d}-{azar.randint(1, 28):02d}",
+        "etiquetas": azar.sample(["casa", "trabajo", "urgente"], azar.randint(0, 2)),
+        "descripcion": "",
+        "completada": False,
+    }
+
+
+def _mutar(tareas, azar, siguiente):
+    """Aplica un cambio al azar (add, rm, done, reordenar o editar)."""
+    tareas = [dict(t) for t in tareas]
+    operacion = azar.choice(["add", "add", "rm", "done", "orden", "editar", "quitar"])
+    if operacion == "add" or not tareas:
+        tareas.insert(azar.randint(0, len(tareas)), _tarea(siguiente, azar))
+    elif operacion == "rm":
+        tareas.pop(azar.randrange(len(tareas)))
+    elif operacion == "done":
+        t = azar.choice(tareas)
+        t["completada"] = not t["completada"]
+    elif operacion == "orden":
+        azar.shuffle(tareas)
+    elif operacion == "editar":
+        azar.choice(tareas)["titulo"] = f"Editada {siguiente}"
+    else:
+        # Un campo que desaparece obliga a guardar la tarea completa
+        azar.choice(tareas).pop("descripcion", None)
+    return tareas
+
+
+class _EnDirectorioTemporal(unittest.TestCase):
+    """Cada prueba corre en un directorio vacío, con historial corto."""
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        anterior = os.getcwd()
+        os.chdir(temporal.name)
+        self.addCleanup(os.chdir, anterior)
+        for nombre, valor in (("CADA_CHECKPOINT", 3), ("RETENCION", 5)):
+            parche = mock.patch.object(historial, nombre, valor)
+            parche.start()
+            self.addCleanup(parche.stop)
+
+
+class TestDeltas(_EnDirectorioTemporal):
+    """Pruebas del cálculo, aplicación y reconstrucción de deltas."""
+
+    def test_aplicar_delta_invierte_calcular_delta(self):
+        """Aplicar el delta calculado debería dar exactamente el estado nuevo."""
+        azar = random.Random(1)
+        antes = []
+        for n in range(300):
+            despues = _mutar(antes, azar, n)
+            delta = historial.calcular_delta(antes, despues)
+            self.assertEqual(historial.aplicar_delta(antes, delta), despues)
+            antes = despues
+
+    def test_reconstruir_cada_revision(self):
+        """Cada revisión retenida debería reconstruirse igual a como se guardó."""
+        azar = random.Random(2)
+        estados = {0: []}
+        actual = []
+        for n in range(60):
+            nuevo = _mutar(actual, azar, n)
+            rev = historial.registrar("datos.json", actual, nuevo, f"cambio {n}")
+            if rev is None:
+                continue
+            estados[rev] = actual = nuevo
+
+            antigua = historial.revision_mas_antigua("datos.json")
+            # La poda nunca descarta las últimas RETENCION revisiones
+            self.assertLessEqual(antigua, max(0, rev - historial.RETENCION))
+            for r in range(antigua, rev + 1):
+                self.assertEqual(historial.reconstruir("datos.json", r), estados[r])
+
+        # Hubo poda: las revisiones más viejas ya no se pueden reconstruir
+        self.assertGreater(historial.revision_mas_antigua("datos.json"), 0)
+        with self.assertRaises(ValueError):
+            historial.reconstruir("datos.json", 0)
+
+
+class TestDeshacer(_EnDirectorioTemporal):
+    """Pruebas de 'deshacer' desde la línea de comandos."""
+
+    def _datos(self):
+        return agenda._leer_datos(agenda.DATA_FILE)
+
+    def test_deshacer_en_cadena(self):
+        """Deshacer varias veces debería retroceder un cambio cada vez."""
+        estados = []
+        for n in range(6):
+            _ejecutar("add", "--titulo", f"Tarea {n}", "--fecha", "2026-01-01",
+                      "--prioridad", "3")
+            estados.append(self._datos())
+        _ejecutar("done", "T-0002")
+        estados.append(self._datos())
+        _ejecutar("rm", "T-0005")
+
+        # Cruza checkpoints (cada 3) y la poda (retención de 5); cada
+        # 'deshacer' también es una revisión, así que sólo caben tres
+        for esperado in reversed(estados[-3:]):
+            _ejecutar("deshacer")
+            self.assertEqual(self._datos(), esperado)
+        self.assertIn("Error", _ejecutar("deshacer"))
+        self.assertEqual(self._datos(), estados[-3])
+
+    def test_deshacer_renombre_y_fusion(self):
+        """Deshacer debería devolver las etiquetas renombradas o fusionadas."""
+        _ejecutar("add", "--titulo", "A", "--fecha", "2026-01-01", "--prioridad", "2",
+                  "--etiquetas", "casa,urgente")
+        _ejecutar("add", "--titulo", "B", "--fecha", "2026-01-02", "--prioridad", "4",
+                  "--etiquetas", "hogar")
+        original = self._datos()
+
+        _ejecutar("etiquetas", "renombrar", "casa", "hogar2")
+        renombrado = self._datos()
+        self.assertEqual(renombrado[0]["etiquetas"], ["hogar2", "urgente"])
+        _ejecutar("etiquetas", "fusionar", "hogar2", "hogar")
+        self.assertEqual(self._datos()[0]["etiquetas"], ["hogar", "urgente"])
+
+        _ejecutar("deshacer")
+        self.assertEqual(self._datos(), renombrado)
+        _ejecutar("deshacer")
+        self.assertEqual(self._datos(), original)
+        with open(agenda.DATA_FILE, encoding="utf-8") as f:
+            self.assertIn("casa", json.load(f)["etiquetas"])
+
+
+class TestCambiosExternos(_EnDirectorioTemporal):
+    """Pruebas de cambios hechos al archivo sin pasar por el historial."""
+
+    def _datos(self):
+        return agenda._leer_datos(agenda.DATA_FILE)
+
+    def _editar_a_mano(self):
+        with open(agenda.DATA_FILE, encoding="utf-8") as f:
+            documento = json.load(f)
+        documento["tareas"].append({"id": "T-0099", "titulo": "A mano", "prioridad": 2,
+                                    "fecha": "2026-02-02", "etiquetas": [],
+                                    "descripcion": "", "completada": False})
+        with open(agenda.DATA_FILE, "w", encoding="utf-8") as f:
+            json.dump(documento, f)
+
+    def test_edicion_a_mano(self):
+        """Una edición a mano debería quedar como revisión antes del siguiente cambio."""
+        for titulo in ("A", "B"):
+            _ejecutar("add", "--titulo", titulo, "--fecha", "2026-01-01",
+                      "--prioridad", "3")
+        antes = self._datos()
+        self._editar_a_mano()
+        editado = self._datos()
+        _ejecutar("rm", "T-0099")
+
+        esperados = {2: antes, 3: editado, 4: antes}
+        for rev, esperado in esperados.items():
+            self.assertEqual(historial.reconstruir(agenda.DATA_FILE, rev), esperado)
+            self.assertNotIn("Error", _ejecutar("ver", "--en", f"r{rev}"))
+        _ejecutar("deshacer")
+        self.assertEqual(self._datos(), editado)
+
+    def test_deshacer_edicion_a_mano(self):
+        """'deshacer' justo después de editar a mano debería revertir la edición."""
+        _ejecutar("add", "--titulo", "A", "--fecha", "2026-01-01", "--prioridad", "3")
+        antes = self._datos()
+        self._editar_a_mano()
+        _ejecutar("deshacer")
+        self.assertEqual(self._datos(), antes)
+
+    def test_historial_danado(self):
+        """Un historial dañado debería reportarse sin lanzar excepciones."""
+        _ejecutar("add", "--titulo", "A", "--fecha", "2026-01-01", "--prioridad", "3")
+        ruta = os.path.join(historial.directorio_historial(agenda.DATA_FILE), "deltas.jsonl")
+        with open(ruta, "a", encoding="utf-8") as f:
+            f.write('{"rev": 2, "fecha": "2026-01-01T00:00:00", "motivo": "rm", '
+                    '"-": ["T-0404"]}\n')
+        self.assertIn("dañado", _ejecutar("ver", "--en", "r2"))
+        self.assertIn("Error", _ejecutar("deshacer", "--pasos", "1"))
+
+        # El siguiente cambio vuelve a anclar el historial al archivo
+        _ejecutar("add", "--titulo", "B", "--fecha", "2026-01-01", "--prioridad", "3")
+        self.assertIn("T-0002", _ejecutar("ver", "--en", "r4"))
+
+
+if __name__ == "__main__":
+    unittest.main()
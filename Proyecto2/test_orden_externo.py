@@ -0,0 +1,148 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import flujo
+import orden_externo
+from etiquetas import codificar, decodificar
+from flujo import iterar_documento
+from orden_externo import OrdenadorExterno
+
+
+def _clave(par):
+    return par[0]
+
+
+class TestOrdenadorExterno(unittest.TestCase):
+    """Pruebas del ordenamiento externo contra sorted()."""
+
+    def _ordenar(self, datos, limite):
+        with OrdenadorExterno(_clave, limite) as orden:
+            orden.extender(datos)
+            return list(orden), orden.en_disco, len(orden)
+
+    def test_igual_a_sorted_y_estable(self):
+        """Con cualquier límite el orden debería ser el de sorted(), empates incluidos."""
+        azar = random.Random(3)
+        # Pocas claves distintas: muchos empates que cruzan corridas
+        datos = [(azar.randint(0, 4), i) for i in range(500)]
+        esperado = sorted(datos, key=_clave)
+        for limite in (1, 2, 7, 64, 499, 500, 1000):
+            resultado, en_disco, total = self._ordenar(datos, limite)
+            self.assertEqual(resultado, esperado, f"límite {limite}")
+            self.assertEqual(en_disco, limite <= len(datos))
+            self.assertEqual(total, len(datos))
+
+    def test_abanico_por_grupos(self):
+        """Con más corridas que ABANICO se combinan por grupos sin perder el orden."""
+        azar = random.Random(4)
+        datos = [(azar.randint(0, 9), i) for i in range(200)]
+        with mock.patch.object(orden_externo, "ABANICO", 3):
+            with OrdenadorExterno(_clave, 7) as orden:
+                orden.extender(datos)
+                self.assertEqual(list(orden), sorted(datos, key=_clave))
+                # Tras la cascada quedan a lo más ABANICO corridas
+                self.assertLessEqual(len(orden._corridas), 3)
+                self.assertEqual(list(orden), sorted(datos, key=_clave))
+
+    def test_cerrar_borra_temporales(self):
+        """Al salir del contexto no deberían quedar archivos temporales."""
+        with OrdenadorExterno(_clave, 2) as orden:
+            orden.extender((i % 3, i) for i in range(10))
+            directorio = orden._directorio
+            self.assertTrue(os.path.isdir(directorio))
+        self.assertFalse(os.path.exists(directorio))
+
+    def test_limite_invalido(self):
+        """Un límite menor a 1 debería lanzar ValueError."""
+        with self.assertRaises(ValueError):
+            OrdenadorExterno(_clave, 0)
+
+
+class TestIterarDocumento(unittest.TestCase):
+    """Pruebas del lector en flujo contra etiquetas.decodificar."""
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        self.ruta = os.path.join(temporal.name, "tareas.json")
+
+    def _tareas(self, n, semilla=5):
+        azar = random.Random(semilla)
+        return [{
+            "id": f"T-{i:04d}",
+            "titulo": azar.choice(["Junta", "Pagar \"renta\"", "Café ☕", "a\\b\nc"]),
+            "prioridad": azar.randint(1, 5),
+            "fecha": "2026-03-01",
+            "etiquetas": azar.sample(["casa", "trabajo", "ñandú"], azar.randint(0, 3)),
+            "descripcion": "x" * azar.randint(0, 40),
+            "completada": azar.random() < 0.5,
+            "avance": azar.choice([0, 12345678901234, -3.25, 1e-7]),
+        } for i in range(n)]
+
+    def _comparar(self, documento, **formato):
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            json.dump(documento, f, ensure_ascii=False, **formato)
+        esperado = decodificar(documento)
+        # Bloques diminutos: valores y números partidos entre lecturas
+        for tam in (1, 2, 3, 7, 64, flujo.TAM_BLOQUE):
+            with mock.patch.object(flujo, "TAM_BLOQUE", tam):
+                self.assertEqual(list(iterar_documento(self.ruta)), esperado,
+                                 f"bloque de {tam}")
+
+    def test_formato_con_vocabulario(self):
+        """El formato versión 2 debería leerse igual que con json.load."""
+        tareas = self._tareas(40)
+        self._comparar(codificar(tareas))
+        self._comparar(codificar(tareas), indent=2)
+
+    def test_cabecera_en_otro_orden(self):
+        """Las tareas antes del vocabulario (archivo editado a mano) también valen."""
+        documento = codificar(self._tareas(15))
+        invertido = {"tareas": documento["tareas"], "version": 2,
+                     "etiquetas": documento["etiquetas"]}
+        self._comparar(invertido)
+
+    def test_numero_al_final_del_bloque(self):
+        """Un número suelto en la cabecera no debería cortarse entre bloques."""
+        documento = codificar(self._tareas(3))
+        documento = {"version": 2, "generado": 123456789012345,
+                     "etiquetas": documento["etiquetas"], "tareas": documento["tareas"]}
+        self._comparar(documento)
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            f.write('{"generado": 98765, "etiquetas": ["casa"], "tareas": []}')
+        for tam in range(1, 20):
+            with mock.patch.object(flujo, "TAM_BLOQUE", tam):
+                self.assertEqual(list(iterar_documento(self.ruta)), [])
+
+    def test_formato_anterior(self):
+        """Una lista de tareas con etiquetas escritas debería seguir leyéndose."""
+        self._comparar(self._tareas(20), indent=1)
+
+    def test_vacios(self):
+        """Agendas vacías y archivo inexistente no deberían generar tareas."""
+        self._comparar([])
+        self._comparar(codificar([]))
+        self.assertEqual(list(iterar_documento(self.ruta + ".no")), [])
+
+    def test_etiquetas_internadas(self):
+        """Tareas con las mismas etiquetas deberían compartir la tupla."""
+        self._comparar(codificar([{**t, "etiquetas": ["casa", "trabajo"]}
+                                  for t in self._tareas(5)]))
+        primera, *resto = iterar_documento(self.ruta)
+        for t in resto:
+            self.assertIs(t["etiquetas"], primera["etiquetas"])
+
+    def test_json_invalido(self):
+        """Un archivo truncado debería lanzar ValueError."""
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            f.write('{"version": 2, "etiquetas": [], "tareas": [{"id": "T-0001"')
+        with self.assertRaises(ValueError):
+            list(iterar_documento(self.ruta))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import calendar
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+import agenda
+from recurrencia import FRECUENCIAS, Recurrencia
+
+
+def _ejecutar(*argumentos):
+    """Ejecuta el CLI de la agenda y devuelve lo que imprimió."""
+    salida = io.StringIO()
+    with mock.patch.object(sys, "argv", ["agenda", *argumentos]), \
+            contextlib.redirect_stdout(salida):
+        agenda.main()
+    return salida.getvalue()
+
+
+def _fuerza_bruta(regla, inicio, desde, hasta):
+    """Expande la regla paso a paso desde `inicio` y filtra a la ventana."""
+    fechas = []
+    k = 0
+    while True:
+        if regla.frecuencia == "mensual":
+            anio, mes = divmod(inicio.month - 1 + k, 12)
+            anio += inicio.year
+            fecha = date(anio, mes + 1, min(inicio.day, calendar.monthrange(anio, mes + 1)[1]))
+            k += regla.intervalo
+        else:
+            fecha = inicio + timedelta(days=k)
+            k += regla.intervalo * (7 if regla.frecuencia == "semanal" else 1)
+        if fecha > hasta or (regla.hasta and fecha > date.fromisoformat(regla.hasta)):
+            break
+        if regla.veces is not None and len(fechas) >= regla.veces:
+            break
+        fechas.append(fecha)
+    return [f for f in fechas if f >= desde]
+
+
+class TestRecurrencia(unittest.TestCase):
+    """Pruebas de la aritmética de fechas de las reglas de repetición."""
+
+    def test_mensual_ajusta_fin_de_mes(self):
+        """El 31 debería pasar al último día de los meses cortos, sin desplazarse."""
+        regla = Recurrencia("mensual")
+        inicio = date(2026, 1, 31)
+        self.assertEqual([regla.fecha_n(inicio, n) for n in range(4)],
+                         [date(2026, 1, 31), date(2026, 2, 28),
+                          date(2026, 3, 31), date(2026, 4, 30)])
+        # Año bisiesto y cambio de año
+        self.assertEqual(regla.fecha_n(date(2027, 11, 30), 3), date(2028, 2, 29))
+        self.assertEqual(Recurrencia("mensual", 5).fecha_n(inicio, 3), date(2027, 4, 30))
+
+    def test_ocurrencias_contra_fuerza_bruta(self):
+        """Las ocurrencias de una ventana deberían coincidir con la expansión completa."""
+        azar = random.Random(6)
+        for _ in range(400):
+            inicio = date(2024, 1, 1) + timedelta(days=azar.randrange(800))
+            regla = Recurrencia(
+                azar.choice(FRECUENCIAS),
+                intervalo=azar.choice([1, 1, 2, 3, 5]),
+                hasta=azar.choice([None, (inicio + timedelta(days=azar.randrange(900)))
+                                   .isoformat()]),
+                veces=azar.choice([None, None, azar.randint(1, 30)]),
+            )
+            desde = inicio + timedelta(days=azar.randrange(-60, 1200))
+            hasta = desde + timedelta(days=azar.randrange(0, 400))
+            esperado = _fuerza_bruta(regla, inicio, desde, hasta)
+            self.assertEqual(list(regla.ocurrencias(inicio, desde, hasta)), esperado,
+                             f"{regla.to_dict()} desde {inicio} en [{desde}, {hasta}]")
+
+    def test_primer_indice_salta_a_la_ventana(self):
+        """El índice inicial debería ser la primera ocurrencia no anterior a `desde`."""
+        azar = random.Random(7)
+        for frecuencia in FRECUENCIAS:
+            for intervalo in (1, 2, 7):
+                regla = Recurrencia(frecuencia, intervalo)
+                for _ in range(50):
+                    inicio = date(2020, 1, 1) + timedelta(days=azar.randrange(1500))
+                    desde = inicio + timedelta(days=azar.randrange(1, 5000))
+                    n = regla._primer_indice(inicio, desde)
+                    self.assertGreaterEqual(regla.fecha_n(inicio, n), desde)
+                    self.assertLess(regla.fecha_n(inicio, n - 1), desde)
+
+    def test_fin_por_veces_y_por_fecha(self):
+        """'veces' cuenta desde la primera ocurrencia y 'hasta' es inclusivo."""
+        inicio = date(2026, 1, 5)
+        por_veces = Recurrencia("semanal", veces=3)
+        self.assertEqual(list(por_veces.ocurrencias(inicio)),
+                         [date(2026, 1, 5), date(2026, 1, 12), date(2026, 1, 19)])
+        self.assertEqual(list(por_veces.ocurrencias(inicio, date(2026, 1, 13))),
+                         [date(2026, 1, 19)])
+        por_fecha = Recurrencia("diaria", 2, hasta="2026-01-09")
+        self.assertEqual(list(por_fecha.ocurrencias(inicio)),
+                         [date(2026, 1, 5), date(2026, 1, 7), date(2026, 1, 9)])
+
+    def test_es_ocurrencia(self):
+        """Sólo las fechas de la regla, dentro de sus límites, son ocurrencias."""
+        inicio = date(2026, 1, 31)
+        regla = Recurrencia("mensual", 2, veces=4)
+        fechas = set(_fuerza_bruta(regla, inicio, inicio, date(2030, 1, 1)))
+        dia = inicio - timedelta(days=5)
+        while dia < date(2027, 1, 1):
+            self.assertEqual(regla.es_ocurrencia(inicio, dia), dia in fechas, dia)
+            dia += timedelta(days=1)
+
+    def test_valores_invalidos(self):
+        """Frecuencia, intervalo o repeticiones inválidos deberían lanzar ValueError."""
+        for argumentos in (("anual",), ("diaria", 0), ("semanal", 1, None, 0)):
+            with self.assertRaises(ValueError):
+                Recurrencia(*argumentos)
+
+
+class TestDoneOcurrencia(unittest.TestCase):
+    """Pruebas de 'done' sobre una ocurrencia de una tarea recurrente."""
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        anterior = os.getcwd()
+        os.chdir(temporal.name)
+        self.addCleanup(os.chdir, anterior)
+        _ejecutar("add", "--titulo", "Junta", "--fecha", "2026-01-05", "--prioridad", "3",
+                  "--repetir", "semanal", "--veces", "4")
+
+    def test_done_guarda_solo_la_excepcion(self):
+        """Marcar una ocurrencia sólo debería agregar su fecha a 'hechas'."""
+        _ejecutar("done", "T-0001@2026-01-12")
+        with open(agenda.DATA_FILE, encoding="utf-8") as f:
+            tarea, = json.load(f)["tareas"]
+        self.assertFalse(tarea["completada"])
+        self.assertEqual(tarea["recurrencia"]["hechas"], ["2026-01-12"])
+
+        salida = _ejecutar("ls", "--desde", "2026-01-01", "--hasta", "2026-02-28")
+        self.assertEqual([linea.split()[:2] for linea in salida.splitlines()],
+                         [["T-0001@2026-01-05", "[.]"], ["T-0001@2026-01-12", "[X]"],
+                          ["T-0001@2026-01-19", "[.]"], ["T-0001@2026-01-26", "[.]"]])
+
+    def test_done_rechaza_fechas_que_no_son_ocurrencia(self):
+        """Fechas fuera de la regla o ids sin fecha deberían dar error sin guardar."""
+        with open(agenda.DATA_FILE, encoding="utf-8") as f:
+            original = f.read()
+        for id_ in ("T-0001@2026-01-13", "T-0001@2026-02-02", "T-0001@mañana", "T-0001"):
+            self.assertIn("Error", _ejecutar("done", id_))
+        with open(agenda.DATA_FILE, encoding="utf-8") as f:
+            self.assertEqual(f.read(), original)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Módulo vigilancia.py
+
+Detecta cambios en el archivo de datos de la agenda (y en sus archivos
+hermanos, como bitácoras o fragmentos) para regenerar la exportación.
+
+Usa inotify de Linux a través de ctypes cuando está disponible y, si no,
+revisa periódicamente la fecha de modificación y el tamaño de los archivos.
+"""
+
+import ctypes
+import ctypes.util
+import glob
+import os
+import select
+import struct
+import time
+
+# Tiempo sin cambios (s) que cierra una ráfaga de eventos
+ESPERA_RAFAGA = 0.3
+# Intervalo de sondeo (s) cuando no hay inotify
+INTERVALO_SONDEO = 0.5
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+_MASCARA = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+            | IN_CREATE | IN_DELETE)
+_EVENTO = struct.Struct("iIII")
+
+
+class Vigilante:
+    """
+    Vigila un archivo de datos y los archivos que comparten su prefijo.
+
+    Atributos:
+        archivo (str): Ruta absoluta del archivo de datos.
+        modo (str): "inotify" o "sondeo", según el mecanismo disponible.
+    """
+
+    def __init__(self, archivo, espera=ESPERA_RAFAGA, intervalo=INTERVALO_SONDEO):
+        """
+        Prepara la vigilancia del archivo.
+
+        Args:
+            archivo (str): Archivo de datos a vigilar.
+            espera (float): Segundos sin cambios que cierran una ráfaga.
+            intervalo (float): Segundos entre revisiones en modo sondeo.
+        """
+        self.archivo = os.path.abspath(archivo)
+        self.espera = espera
+        self.intervalo = intervalo
+        self._directorio = os.path.dirname(self.archivo)
+        self._prefijo = os.path.basename(self.archivo)
+        self._fd = self._abrir_inotify()
+        self.modo = "inotify" if self._fd is not None else "sondeo"
+        self._estado = self._instantanea()
+
+    def _abrir_inotify(self):
+        """Crea un descriptor inotify sobre el directorio, o None si no hay."""
+        nombre = ctypes.util.find_library("c")
+        try:
+            libc = ctypes.CDLL(nombre, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError, TypeError):
+            return None
+        if fd < 0:
+            return None
+        # Se vigila el directorio: así se detectan también los reemplazos
+        # por renombrado y los archivos hermanos que aparezcan después.
+        if libc.inotify_add_watch(fd, os.fsencode(self._directorio), _MASCARA) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def _rutas(self):
+        """Archivo de datos más los hermanos que comparten su nombre."""
+        patron = glob.escape(self.archivo) + "*"
+        return sorted(set(glob.glob(patron)) | {self.archivo})
+
+    def _instantanea(self):
+        """Mapa ruta -> (mtime, tamaño) de los archivos vigilados."""
+        estado = {}
+        for ruta in self._rutas():
+            try:
+                st = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            estado[ruta] = (st.st_mtime_ns, st.st_size)
+        return estado
+
+    def _hubo_cambio(self, tiempo):
+        """Espera hasta `tiempo` segundos (None = sin límite) por un cambio."""
+        if self._fd is not None:
+            return self._leer_eventos(tiempo)
+        limite = None if tiempo is None else time.monotonic() + tiempo
+        while True:
+            estado = self._instantanea()
+            if estado != self._estado:
+                self._estado = estado
+                return True
+            if limite is not None and time.monotonic() >= limite:
+                return False
+            pausa = self.intervalo
+            if limite is not None:
+                pausa = min(pausa, max(0.0, limite - time.monotonic()))
+            time.sleep(pausa)
+
+    def _leer_eventos(self, tiempo):
+        """Lee eventos inotify y dice si alguno toca un archivo vigilado."""
+        limite = None if tiempo is None else time.monotonic() + tiempo
+        while True:
+            restante = None if limite is None else max(0.0, limite - time.monotonic())
+            listos, _, _ = select.select([self._fd], [], [], restante)
+            if not listos:
+                return False
+            try:
+                datos = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            pos = 0
+            while pos < len(datos):
+                _, _, _, largo = _EVENTO.unpack_from(datos, pos)
+                pos += _EVENTO.size
+                nombre = os.fsdecode(datos[pos:pos + largo].rstrip(b"\0"))
+                pos += largo
+                if nombre.startswith(self._prefijo):
+                    return True
+
+    def esperar_rafaga(self):
+        """
+        Bloquea hasta que haya cambios y espera a que la ráfaga termine.
+
+        Returns:
+            float: Instante (time.perf_counter) del primer cambio detectado.
+        """
+        self._hubo_cambio(None)
+        primero = time.perf_counter()
+        while self._hubo_cambio(self.espera):
+            pass
+        return primero
+
+    def cerrar(self):
+        """Libera el descriptor de inotify, si lo hay."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None